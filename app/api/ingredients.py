@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, UploadFile, File
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import uuid
-import base64
+import pybase64
 import logging
 from datetime import datetime, timedelta
 
@@ -183,7 +183,7 @@ async def scan_ingredients(request: ScanRequest):
         
         # Decode base64 image to bytes for Groq service
         try:
-            image_bytes = base64.b64decode(image_data)
+            image_bytes = pybase64.b64decode(image_data)
         except Exception as e:
             logger.error(f"Failed to decode base64 image: {str(e)}")
             raise HTTPException(status_code=400, detail="Invalid base64 image data")
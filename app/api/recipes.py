@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
+import re
 import uuid
+import asyncio
 import logging
 from datetime import datetime
 
@@ -14,6 +16,39 @@ from app.services.ai.gemini_service import gemini_service
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["recipes"])
 
+# Map cooking time preference to difficulty
+_DIFFICULTY_MAP = {
+    "under30": "easy",
+    "30to60": "medium",
+    "over60": "hard"
+}
+
+# Cuisines to try when the request has no cuisine preferences
+_DEFAULT_CUISINES = ("International",)
+
+# Simplified conversions for common cooking measurements
+_UNIT_CONVERSIONS = {
+    ("cups", "ml"): 236.588,
+    ("tbsp", "ml"): 14.787,
+    ("tsp", "ml"): 4.929,
+    ("oz", "g"): 28.35,
+    ("lb", "g"): 453.592,
+    ("kg", "g"): 1000,
+}
+
+# First number in an amount string like "1.5 cups"
+_QUANTITY_RE = re.compile(r'\d+\.?\d*')
+
+def _name_and_description_final(partial: Dict[str, Any]) -> bool:
+    """
+    True once a streamed partial recipe has a non-empty name and description that can no
+    longer change, i.e. some other key has already been parsed after both of them.
+    """
+    keys = list(partial)
+    if not (partial.get("name") or "").strip() or "description" not in keys:
+        return False
+    return max(keys.index("name"), keys.index("description")) < len(keys) - 1
+
 # Request/Response models for the specific API endpoints
 class GenerateRecipeRequest(BaseModel):
     mustUseIngredients: Optional[List[str]] = None
@@ -78,16 +113,11 @@ async def generate_recipes(request: GenerateRecipeRequest):
         cooking_time = preferences.get("cookingTime", "medium")
         
         # Map cooking time to difficulty
-        difficulty_map = {
-            "under30": "easy",
-            "30to60": "medium", 
-            "over60": "hard"
-        }
-        difficulty = difficulty_map.get(cooking_time, "medium")
+        difficulty = _DIFFICULTY_MAP.get(cooking_time, "medium")
         
         # Generate single recipe suggestion (FIXED: was generating multiple recipes)
         recipes = []
-        cuisines_to_try = cuisine_preferences if cuisine_preferences else ["International"]
+        cuisines_to_try = cuisine_preferences if cuisine_preferences else _DEFAULT_CUISINES
         
         # DUPLICATION FIX: Only generate ONE recipe, not multiple
         selected_cuisine = cuisines_to_try[0]  # Take the first (or only) cuisine preference
@@ -95,14 +125,25 @@ async def generate_recipes(request: GenerateRecipeRequest):
         logger.info(f"RECIPE GENERATION DEBUG: Generating SINGLE recipe for cuisine: {selected_cuisine}")
         logger.info(f"RECIPE GENERATION DEBUG: DUPLICATION FIX APPLIED - will create only 1 recipe with 1 image")
         
+        image_task = None
+        image_task_name = None
         try:
             logger.info(f"RECIPE GENERATION DEBUG: Starting recipe generation for cuisine: {selected_cuisine}")
-            # Generate recipe using Gemini service
-            recipe_dict = await gemini_service.generate_recipe(
+            # Generate recipe using Gemini service, streaming it so the image can start
+            # as soon as the name and description are final instead of after the whole recipe
+            recipe_dict = {}
+            async for recipe_dict in gemini_service.generate_recipe_stream(
                 ingredients=available_ingredients,
                 cuisine_preference=selected_cuisine,
                 difficulty=difficulty
-            )
+            ):
+                if image_task is None and _name_and_description_final(recipe_dict):
+                    logger.info(f"IMAGE GENERATION DEBUG: Starting image generation early for recipe: {recipe_dict['name']}")
+                    image_task_name = recipe_dict["name"]
+                    image_task = asyncio.create_task(gemini_service.generate_recipe_image(
+                        recipe_name=recipe_dict["name"],
+                        recipe_description=recipe_dict.get("description") or "A delicious recipe"
+                    ))
                 
             # Calculate match score based on available ingredients
             match_score = calculate_match_score(recipe_dict.get("ingredients", []), available_ingredients)
@@ -123,10 +164,18 @@ async def generate_recipes(request: GenerateRecipeRequest):
                     image_generation_attempted = True
                     logger.debug(f"Attempting image generation for: {recipe_name}")
                     
-                    image_url = await gemini_service.generate_recipe_image(
-                        recipe_name=recipe_name,
-                        recipe_description=recipe_description or "A delicious recipe"
-                    )
+                    if image_task is not None and image_task_name == recipe_name:
+                        image_url = await image_task
+                    else:
+                        # The final recipe isn't the dish the early image was started for
+                        # (validation renamed it, or the stream failed and we got the mock)
+                        if image_task is not None:
+                            image_task.cancel()
+                            image_task = None
+                        image_url = await gemini_service.generate_recipe_image(
+                            recipe_name=recipe_name,
+                            recipe_description=recipe_description or "A delicious recipe"
+                        )
                     
                     if image_url:
                         logger.info(f"Successfully generated image for recipe: {recipe_name}")
@@ -212,6 +261,10 @@ async def generate_recipes(request: GenerateRecipeRequest):
                 
         except Exception as e:
             logger.error(f"Error generating recipe for cuisine {selected_cuisine}: {e}")
+        finally:
+            # Don't leave an early image generation running for a recipe that is never stored
+            if image_task is not None and not image_task.done():
+                image_task.cancel()
         
         logger.info(f"RECIPE GENERATION DEBUG: DUPLICATION FIX - Final result - returning {len(recipes)} recipes")
         logger.info(f"RECIPE GENERATION DEBUG: Recipe names: {[r.name for r in recipes]}")
@@ -465,13 +518,16 @@ def calculate_match_score(recipe_ingredients: List[Dict[str, Any]], available_in
     if not recipe_ingredients:
         return 0.0
     
-    available_lower = [ing.lower() for ing in available_ingredients]
+    available_lower = {ing.lower() for ing in available_ingredients}
     matches = 0
     
     for recipe_ing in recipe_ingredients:
         ing_name = recipe_ing.get("name", "").lower()
+        # Exact names are a single hash probe; only fall back to the substring scan otherwise
+        if ing_name in available_lower:
+            matches += 1
         # Check if any available ingredient contains the recipe ingredient name
-        if any(ing_name in avail or avail in ing_name for avail in available_lower):
+        elif any(ing_name in avail or avail in ing_name for avail in available_lower):
             matches += 1
     
     return matches / len(recipe_ingredients)
@@ -479,10 +535,9 @@ def calculate_match_score(recipe_ingredients: List[Dict[str, Any]], available_in
 def parse_quantity(amount_str: str) -> float:
     """Parse quantity from string format"""
     try:
-        import re
-        numbers = re.findall(r'\d+\.?\d*', str(amount_str))
-        if numbers:
-            return float(numbers[0])
+        match = _QUANTITY_RE.search(str(amount_str))
+        if match:
+            return float(match.group())
         return 1.0
     except:
         return 1.0
@@ -490,16 +545,7 @@ def parse_quantity(amount_str: str) -> float:
 def convert_units(from_unit: str, to_unit: str, quantity: float) -> float:
     """Simple unit conversion for common cooking measurements"""
     # This is a simplified conversion - in a real app you'd want a more comprehensive system
-    conversions = {
-        ("cups", "ml"): 236.588,
-        ("tbsp", "ml"): 14.787,
-        ("tsp", "ml"): 4.929,
-        ("oz", "g"): 28.35,
-        ("lb", "g"): 453.592,
-        ("kg", "g"): 1000,
-    }
-    
-    conversion_factor = conversions.get((from_unit.lower(), to_unit.lower()), 1.0)
+    conversion_factor = _UNIT_CONVERSIONS.get((from_unit.lower(), to_unit.lower()), 1.0)
     return quantity * conversion_factor
 
 def _parse_time_to_minutes(time_str: str) -> int:
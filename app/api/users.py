@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from types import MappingProxyType
 from typing import Dict, Any, Optional, List
 
 try:
@@ -13,13 +14,24 @@ router = APIRouter()
 DEMO_USER_ID = "demo_user"
 
 # Default preferences as specified in the requirements
-DEFAULT_PREFERENCES = {
-    "dietaryRestrictions": [],
-    "allergens": [],
-    "cuisinePreferences": ["italian", "american", "mexican"],
+# Read-only so no request can accidentally mutate the shared defaults
+DEFAULT_PREFERENCES = MappingProxyType({
+    "dietaryRestrictions": (),
+    "allergens": (),
+    "cuisinePreferences": ("italian", "american", "mexican"),
     "cookingTime": "any",
     "skillLevel": "beginner"
-}
+})
+
+# Preference fields accepted by update_preferences
+_VALID_PREF_FIELDS = frozenset({
+    "dietaryRestrictions", "allergens", "cuisinePreferences",
+    "cookingTime", "skillLevel"
+})
+
+def _default_preferences() -> Dict[str, Any]:
+    """Build a fresh, mutable copy of the default preferences for a response"""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in DEFAULT_PREFERENCES.items()}
 
 @router.get("/preferences")
 async def get_preferences():
@@ -42,17 +54,17 @@ async def get_preferences():
         if user_doc and "preferences" in user_doc:
             # Return existing preferences, filling in any missing fields with defaults
             preferences = user_doc["preferences"]
-            result = DEFAULT_PREFERENCES.copy()
+            result = _default_preferences()
             result.update(preferences)
             return result
         else:
             # Return default preferences if no user document exists
-            return DEFAULT_PREFERENCES
+            return _default_preferences()
             
     except Exception as e:
         # If there's any error, return default preferences
         print(f"Error getting preferences: {e}")
-        return DEFAULT_PREFERENCES
+        return _default_preferences()
 
 @router.post("/preferences")
 async def update_preferences(preferences: Dict[str, Any]):
@@ -81,7 +93,7 @@ async def update_preferences(preferences: Dict[str, Any]):
     """
     try:
         # Get current preferences first
-        current_preferences = DEFAULT_PREFERENCES.copy()
+        current_preferences = _default_preferences()
         
         try:
             user_doc = await firebase_service.get_document("users", DEMO_USER_ID)
@@ -92,16 +104,12 @@ async def update_preferences(preferences: Dict[str, Any]):
             pass
         
         # Update only the provided fields (partial update)
-        updated_preferences = current_preferences.copy()
+        # current_preferences is already a per-request copy, so update it in place
+        updated_preferences = current_preferences
         
         # Validate and update each field if provided
-        valid_fields = {
-            "dietaryRestrictions", "allergens", "cuisinePreferences", 
-            "cookingTime", "skillLevel"
-        }
-        
         for field, value in preferences.items():
-            if field in valid_fields:
+            if field in _VALID_PREF_FIELDS:
                 updated_preferences[field] = value
         
         # Save updated preferences to Firebase
@@ -110,12 +118,8 @@ async def update_preferences(preferences: Dict[str, Any]):
             "userId": DEMO_USER_ID
         }
         
-        # Try to update existing document, create if it doesn't exist
-        existing_doc = await firebase_service.get_document("users", DEMO_USER_ID)
-        if existing_doc:
-            success = await firebase_service.update_document("users", DEMO_USER_ID, user_data)
-        else:
-            success = await firebase_service.create_document("users", DEMO_USER_ID, user_data)
+        # Upsert in a single round-trip instead of get + update/create
+        success = await firebase_service.set_document_merge("users", DEMO_USER_ID, user_data)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save preferences to database")
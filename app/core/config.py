@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     # AI Service API Keys
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_MAX_CONCURRENT_REQUESTS: int = int(os.getenv("GEMINI_MAX_CONCURRENT_REQUESTS", "4"))
+    GEMINI_MAX_REQUESTS_PER_MINUTE: int = int(os.getenv("GEMINI_MAX_REQUESTS_PER_MINUTE", "60"))
+    GEMINI_MAX_ATTEMPTS: int = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+    # Concurrent generate_recipe calls arriving within the window share one Gemini call (1 disables)
+    GEMINI_RECIPE_BATCH_SIZE: int = int(os.getenv("GEMINI_RECIPE_BATCH_SIZE", "3"))
+    GEMINI_RECIPE_BATCH_WINDOW_MS: int = int(os.getenv("GEMINI_RECIPE_BATCH_WINDOW_MS", "20"))
     
     @property
     def firebase_credentials(self) -> Dict[str, Any]:
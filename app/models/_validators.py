@@ -0,0 +1,22 @@
+"""
+Small value coercions shared by model field validators
+"""
+import sys
+from datetime import datetime, timezone
+from typing import Any
+
+def epoch_seconds(value: Any) -> Any:
+    """Accept a datetime (e.g. from older stored documents) for epoch timestamp fields"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return value
+
+def intern_str(value: Any) -> Any:
+    """Intern repeated strings (ingredient names, units, tags) so duplicates share one object"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, (list, tuple)):
+        return [sys.intern(v) if isinstance(v, str) else v for v in value]
+    return value
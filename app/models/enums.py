@@ -0,0 +1,33 @@
+"""
+Enums shared by the recipe and user models
+"""
+from enum import Enum
+
+class DifficultyLevel(str, Enum):
+    EASY = "Easy"
+    MEDIUM = "Medium"
+    HARD = "Hard"
+
+class MealType(str, Enum):
+    BREAKFAST = "breakfast"
+    LUNCH = "lunch"
+    DINNER = "dinner"
+    SNACK = "snack"
+    DESSERT = "dessert"
+
+class DietaryRestriction(str, Enum):
+    VEGETARIAN = "vegetarian"
+    VEGAN = "vegan"
+    GLUTEN_FREE = "gluten_free"
+    DAIRY_FREE = "dairy_free"
+    NUT_FREE = "nut_free"
+    LOW_CARB = "low_carb"
+    KETO = "keto"
+    PALEO = "paleo"
+    HALAL = "halal"
+    KOSHER = "kosher"
+
+class CookingSkillLevel(str, Enum):
+    BEGINNER = "beginner"
+    INTERMEDIATE = "intermediate"
+    ADVANCED = "advanced"
@@ -1,94 +1,135 @@
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
-from enum import Enum
-
-class DifficultyLevel(str, Enum):
-    EASY = "Easy"
-    MEDIUM = "Medium"
-    HARD = "Hard"
-
-class MealType(str, Enum):
-    BREAKFAST = "breakfast"
-    LUNCH = "lunch"
-    DINNER = "dinner"
-    SNACK = "snack"
-    DESSERT = "dessert"
+import time
+from datetime import datetime, timezone
+from typing import Annotated, Any
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter, computed_field, field_validator
+
+from ._validators import epoch_seconds, intern_str
+from .enums import DifficultyLevel, MealType
 
 class RecipeIngredient(BaseModel):
-    name: str = Field(..., description="Name of the ingredient")
-    quantity: float = Field(..., description="Quantity needed")
-    unit: str = Field(..., description="Unit of measurement")
-    optional: bool = Field(default=False, description="Whether ingredient is optional")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    name: Annotated[str, Field(description="Name of the ingredient")]
+    quantity: Annotated[float, Field(description="Quantity needed")]
+    unit: Annotated[str, Field(description="Unit of measurement")]
+    optional: Annotated[bool, Field(description="Whether ingredient is optional")] = False
+
+    @field_validator("name", "unit", mode="before")
+    @classmethod
+    def _intern_strings(cls, v):
+        return intern_str(v)
 
 class RecipeStep(BaseModel):
-    step_number: int = Field(..., description="Step number in the recipe")
-    instruction: str = Field(..., description="Instruction for this step")
-    duration_minutes: Optional[int] = Field(None, description="Time required for this step")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    step_number: Annotated[int, Field(description="Step number in the recipe")]
+    instruction: Annotated[str, Field(description="Instruction for this step")]
+    duration_minutes: Annotated[int | None, Field(description="Time required for this step")] = None
 
 class NutritionInfo(BaseModel):
-    calories: Optional[int] = Field(None, description="Calories per serving")
-    protein_g: Optional[float] = Field(None, description="Protein in grams")
-    carbs_g: Optional[float] = Field(None, description="Carbohydrates in grams")
-    fat_g: Optional[float] = Field(None, description="Fat in grams")
-    fiber_g: Optional[float] = Field(None, description="Fiber in grams")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    calories: Annotated[int | None, Field(description="Calories per serving")] = None
+    protein_g: Annotated[float | None, Field(description="Protein in grams")] = None
+    carbs_g: Annotated[float | None, Field(description="Carbohydrates in grams")] = None
+    fat_g: Annotated[float | None, Field(description="Fat in grams")] = None
+    fiber_g: Annotated[float | None, Field(description="Fiber in grams")] = None
 
 class RecipeBase(BaseModel):
-    title: str = Field(..., description="Recipe title")
-    description: Optional[str] = Field(None, description="Recipe description")
-    ingredients: List[RecipeIngredient] = Field(..., description="List of ingredients")
-    steps: List[RecipeStep] = Field(..., description="Cooking steps")
-    prep_time_minutes: Optional[int] = Field(None, description="Preparation time in minutes")
-    cook_time_minutes: Optional[int] = Field(None, description="Cooking time in minutes")
-    servings: int = Field(default=1, description="Number of servings")
-    difficulty: DifficultyLevel = Field(default=DifficultyLevel.MEDIUM, description="Difficulty level")
-    meal_type: List[MealType] = Field(default=[], description="Types of meals this recipe is suitable for")
-    cuisine: Optional[str] = Field(None, description="Cuisine type (e.g., 'Italian', 'Asian')")
-    tags: List[str] = Field(default=[], description="Recipe tags")
-    nutrition: Optional[NutritionInfo] = Field(None, description="Nutritional information")
+    title: Annotated[str, Field(description="Recipe title")]
+    description: Annotated[str | None, Field(description="Recipe description")] = None
+    ingredients: Annotated[list[RecipeIngredient], Field(description="List of ingredients")]
+    steps: Annotated[list[RecipeStep], Field(description="Cooking steps")]
+    prep_time_minutes: Annotated[int | None, Field(description="Preparation time in minutes")] = None
+    cook_time_minutes: Annotated[int | None, Field(description="Cooking time in minutes")] = None
+    servings: Annotated[int, Field(description="Number of servings")] = 1
+    difficulty: Annotated[DifficultyLevel, Field(description="Difficulty level")] = DifficultyLevel.MEDIUM
+    meal_type: Annotated[tuple[MealType, ...], Field(description="Types of meals this recipe is suitable for")] = ()
+    cuisine: Annotated[str | None, Field(description="Cuisine type (e.g., 'Italian', 'Asian')")] = None
+    tags: Annotated[tuple[str, ...], Field(description="Recipe tags")] = ()
+    nutrition: Annotated[NutritionInfo | None, Field(description="Nutritional information")] = None
+
+    @field_validator("cuisine", "tags", mode="before")
+    @classmethod
+    def _intern_strings(cls, v):
+        return intern_str(v)
 
 class RecipeCreate(RecipeBase):
     pass
 
 class RecipeUpdate(BaseModel):
-    title: Optional[str] = None
-    description: Optional[str] = None
-    ingredients: Optional[List[RecipeIngredient]] = None
-    steps: Optional[List[RecipeStep]] = None
-    prep_time_minutes: Optional[int] = None
-    cook_time_minutes: Optional[int] = None
-    servings: Optional[int] = None
-    difficulty: Optional[DifficultyLevel] = None
-    meal_type: Optional[List[MealType]] = None
-    cuisine: Optional[str] = None
-    tags: Optional[List[str]] = None
-    nutrition: Optional[NutritionInfo] = None
+    title: str | None = None
+    description: str | None = None
+    ingredients: list[RecipeIngredient] | None = None
+    steps: list[RecipeStep] | None = None
+    prep_time_minutes: int | None = None
+    cook_time_minutes: int | None = None
+    servings: int | None = None
+    difficulty: DifficultyLevel | None = None
+    meal_type: tuple[MealType, ...] | None = None
+    cuisine: str | None = None
+    tags: tuple[str, ...] | None = None
+    nutrition: NutritionInfo | None = None
 
 class Recipe(RecipeBase):
-    id: str = Field(..., description="Unique identifier for the recipe")
-    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
-    image_url: Optional[str] = Field(None, description="URL to recipe image")
-    cooked_count: int = Field(default=0, description="Number of times this recipe has been cooked")
-    last_cooked: Optional[datetime] = Field(None, description="Last time this recipe was cooked")
-    rating: Optional[float] = Field(None, description="User rating (1-5)")
+    id: Annotated[str, Field(description="Unique identifier for the recipe")]
+    created_at_ts: float = Field(
+        default_factory=time.time,
+        validation_alias=AliasChoices("created_at_ts", "created_at"),
+        description="Creation timestamp (epoch seconds)"
+    )
+    updated_at_ts: float = Field(
+        default_factory=time.time,
+        validation_alias=AliasChoices("updated_at_ts", "updated_at"),
+        description="Last update timestamp (epoch seconds)"
+    )
+    image_url: Annotated[str | None, Field(description="URL to recipe image")] = None
+    cooked_count: Annotated[int, Field(description="Number of times this recipe has been cooked")] = 0
+    last_cooked: Annotated[datetime | None, Field(description="Last time this recipe was cooked")] = None
+    rating: Annotated[float | None, Field(description="User rating (1-5)")] = None
     
     class Config:
         from_attributes = True
 
+    @field_validator("created_at_ts", "updated_at_ts", mode="before")
+    @classmethod
+    def _coerce_timestamps(cls, v):
+        return epoch_seconds(v)
+
+    @computed_field
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at_ts, tz=timezone.utc)
+
+    @computed_field
+    @property
+    def updated_at(self) -> datetime:
+        return datetime.fromtimestamp(self.updated_at_ts, tz=timezone.utc)
+
 class RecipeGenerationRequest(BaseModel):
-    available_ingredients: List[str] = Field(..., description="List of available ingredient names")
-    meal_type: Optional[MealType] = Field(None, description="Preferred meal type")
-    cuisine: Optional[str] = Field(None, description="Preferred cuisine")
-    dietary_restrictions: List[str] = Field(default=[], description="Dietary restrictions")
-    max_prep_time: Optional[int] = Field(None, description="Maximum preparation time in minutes")
-    servings: int = Field(default=2, description="Number of servings needed")
+    """Service-level input for recipe generation: available ingredient names, optional
+    meal type / cuisine / dietary restrictions, max prep time in minutes and servings."""
+    model_config = ConfigDict(frozen=True)
+
+    available_ingredients: tuple[str, ...]
+    meal_type: MealType | None = None
+    cuisine: str | None = None
+    dietary_restrictions: tuple[str, ...] = ()
+    max_prep_time: int | None = None
+    servings: int = 2
 
 class RecipeGenerationResponse(BaseModel):
-    recipe: RecipeCreate = Field(..., description="Generated recipe")
-    missing_ingredients: List[str] = Field(..., description="Ingredients not available but needed")
-    confidence: float = Field(..., description="Confidence score of the generation")
+    recipe: Annotated[RecipeCreate, Field(description="Generated recipe")]
+    missing_ingredients: Annotated[list[str], Field(description="Ingredients not available but needed")]
+    confidence: Annotated[float, Field(description="Confidence score of the generation")]
 
 class MarkCookedRequest(BaseModel):
-    rating: Optional[float] = Field(None, description="Rating for the cooked recipe (1-5)")
-    notes: Optional[str] = Field(None, description="Notes about cooking experience")
\ No newline at end of file
+    rating: Annotated[float | None, Field(description="Rating for the cooked recipe (1-5)")] = None
+    notes: Annotated[str | None, Field(description="Notes about cooking experience")] = None
+
+# Validator is built once at import and shared by every call
+_RECIPE_CREATE_ADAPTER = TypeAdapter(RecipeCreate)
+
+def validate_recipe_create(data: dict[str, Any]) -> RecipeCreate:
+    """Validate a plain (possibly nested) dict into a RecipeCreate"""
+    return _RECIPE_CREATE_ADAPTER.validate_python(data)
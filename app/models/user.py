@@ -1,75 +1,87 @@
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
-from enum import Enum
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Annotated
+from pydantic import AliasChoices, BaseModel, Field, computed_field, field_validator
 
-from .recipe import MealType, DifficultyLevel
-
-class DietaryRestriction(str, Enum):
-    VEGETARIAN = "vegetarian"
-    VEGAN = "vegan"
-    GLUTEN_FREE = "gluten_free"
-    DAIRY_FREE = "dairy_free"
-    NUT_FREE = "nut_free"
-    LOW_CARB = "low_carb"
-    KETO = "keto"
-    PALEO = "paleo"
-    HALAL = "halal"
-    KOSHER = "kosher"
-
-class CookingSkillLevel(str, Enum):
-    BEGINNER = "beginner"
-    INTERMEDIATE = "intermediate"
-    ADVANCED = "advanced"
+from ._validators import epoch_seconds
+from .enums import MealType, DifficultyLevel, DietaryRestriction, CookingSkillLevel
 
 class UserPreferencesBase(BaseModel):
-    dietary_restrictions: List[DietaryRestriction] = Field(default=[], description="User's dietary restrictions")
-    favorite_cuisines: List[str] = Field(default=[], description="Preferred cuisines")
-    disliked_ingredients: List[str] = Field(default=[], description="Ingredients the user dislikes")
-    preferred_meal_types: List[MealType] = Field(default=[], description="Preferred meal types")
-    max_prep_time: Optional[int] = Field(None, description="Maximum preparation time preference in minutes")
-    max_cook_time: Optional[int] = Field(None, description="Maximum cooking time preference in minutes")
-    preferred_difficulty: List[DifficultyLevel] = Field(default=[], description="Preferred difficulty levels")
-    cooking_skill_level: CookingSkillLevel = Field(default=CookingSkillLevel.BEGINNER, description="User's cooking skill level")
-    household_size: int = Field(default=1, description="Number of people in household")
-    budget_conscious: bool = Field(default=False, description="Whether user prefers budget-friendly recipes")
-    health_conscious: bool = Field(default=False, description="Whether user prefers healthy recipes")
-    quick_meals_preference: bool = Field(default=False, description="Whether user prefers quick meals")
+    dietary_restrictions: Annotated[tuple[DietaryRestriction, ...], Field(description="User's dietary restrictions")] = ()
+    favorite_cuisines: Annotated[tuple[str, ...], Field(description="Preferred cuisines")] = ()
+    disliked_ingredients: Annotated[tuple[str, ...], Field(description="Ingredients the user dislikes")] = ()
+    preferred_meal_types: Annotated[tuple[MealType, ...], Field(description="Preferred meal types")] = ()
+    max_prep_time: Annotated[int | None, Field(description="Maximum preparation time preference in minutes")] = None
+    max_cook_time: Annotated[int | None, Field(description="Maximum cooking time preference in minutes")] = None
+    preferred_difficulty: Annotated[tuple[DifficultyLevel, ...], Field(description="Preferred difficulty levels")] = ()
+    cooking_skill_level: Annotated[CookingSkillLevel, Field(description="User's cooking skill level")] = CookingSkillLevel.BEGINNER
+    household_size: Annotated[int, Field(description="Number of people in household")] = 1
+    budget_conscious: Annotated[bool, Field(description="Whether user prefers budget-friendly recipes")] = False
+    health_conscious: Annotated[bool, Field(description="Whether user prefers healthy recipes")] = False
+    quick_meals_preference: Annotated[bool, Field(description="Whether user prefers quick meals")] = False
 
 class UserPreferencesCreate(UserPreferencesBase):
     pass
 
 class UserPreferencesUpdate(BaseModel):
-    dietary_restrictions: Optional[List[DietaryRestriction]] = None
-    favorite_cuisines: Optional[List[str]] = None
-    disliked_ingredients: Optional[List[str]] = None
-    preferred_meal_types: Optional[List[MealType]] = None
-    max_prep_time: Optional[int] = None
-    max_cook_time: Optional[int] = None
-    preferred_difficulty: Optional[List[DifficultyLevel]] = None
-    cooking_skill_level: Optional[CookingSkillLevel] = None
-    household_size: Optional[int] = None
-    budget_conscious: Optional[bool] = None
-    health_conscious: Optional[bool] = None
-    quick_meals_preference: Optional[bool] = None
+    dietary_restrictions: list[DietaryRestriction] | None = None
+    favorite_cuisines: list[str] | None = None
+    disliked_ingredients: list[str] | None = None
+    preferred_meal_types: list[MealType] | None = None
+    max_prep_time: int | None = None
+    max_cook_time: int | None = None
+    preferred_difficulty: list[DifficultyLevel] | None = None
+    cooking_skill_level: CookingSkillLevel | None = None
+    household_size: int | None = None
+    budget_conscious: bool | None = None
+    health_conscious: bool | None = None
+    quick_meals_preference: bool | None = None
 
 class UserPreferences(UserPreferencesBase):
-    id: str = Field(..., description="Unique identifier for user preferences")
-    user_id: str = Field(default="default_user", description="User identifier (single user system)")
-    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    id: Annotated[str, Field(description="Unique identifier for user preferences")]
+    user_id: Annotated[str, Field(description="User identifier (single user system)")] = "default_user"
+    created_at_ts: float = Field(
+        default_factory=time.time,
+        validation_alias=AliasChoices("created_at_ts", "created_at"),
+        description="Creation timestamp (epoch seconds)"
+    )
+    updated_at_ts: float = Field(
+        default_factory=time.time,
+        validation_alias=AliasChoices("updated_at_ts", "updated_at"),
+        description="Last update timestamp (epoch seconds)"
+    )
     
     class Config:
         from_attributes = True
 
-class UserStats(BaseModel):
-    total_recipes_cooked: int = Field(default=0, description="Total number of recipes cooked")
-    favorite_cuisine: Optional[str] = Field(None, description="Most frequently cooked cuisine")
-    average_rating: Optional[float] = Field(None, description="Average rating given to recipes")
-    total_ingredients_used: int = Field(default=0, description="Total number of different ingredients used")
-    cooking_streak_days: int = Field(default=0, description="Current cooking streak in days")
-    last_cooked_date: Optional[datetime] = Field(None, description="Last time user cooked a recipe")
-    
-class UserProfile(BaseModel):
+    @field_validator("created_at_ts", "updated_at_ts", mode="before")
+    @classmethod
+    def _coerce_timestamps(cls, v):
+        return epoch_seconds(v)
+
+    @computed_field
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at_ts, tz=timezone.utc)
+
+    @computed_field
+    @property
+    def updated_at(self) -> datetime:
+        return datetime.fromtimestamp(self.updated_at_ts, tz=timezone.utc)
+
+@dataclass(slots=True, frozen=True)
+class UserStats:
+    """Cooking totals for the user, favourite cuisine, average rating given,
+    current streak in days and when they last cooked. Output-only, so not validated."""
+    total_recipes_cooked: int = 0
+    favorite_cuisine: str | None = None
+    average_rating: float | None = None
+    total_ingredients_used: int = 0
+    cooking_streak_days: int = 0
+    last_cooked_date: datetime | None = None
+
+@dataclass(slots=True, frozen=True)
+class UserProfile:
     preferences: UserPreferences
-    stats: UserStats
\ No newline at end of file
+    stats: UserStats
@@ -1,98 +1,430 @@
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Optional, AsyncIterator
 import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-import google.genai as genai_client
-from google.genai import types
+from google.generativeai.types import HarmCategory, HarmBlockThreshold, generation_types
+from google.api_core import exceptions as google_exceptions
 from PIL import Image
 from io import BytesIO
+from types import MappingProxyType
 import base64
 import asyncio
+import copy
 import os
+import re
+import sys
+import threading
 import uuid
+from functools import lru_cache
 
 from app.core.config import settings
 from app.models.recipe import (
     RecipeCreate, RecipeGenerationRequest, RecipeIngredient,
-    RecipeStep, DifficultyLevel, MealType, NutritionInfo
+    RecipeStep, DifficultyLevel, MealType, NutritionInfo, validate_recipe_create
 )
 from app.services.firebase.storage import firebase_storage_service
+from app.utils.cache import TTLCache
+from app.utils.genai_config import configure_genai
+from app.utils.images import JPEG_SIGNATURE, image_dimensions
+from app.utils.json_repair import JsonStreamBuffer, loads_lenient, repair_json
+from app.utils.rate_limit import AsyncRateLimiter, retry_async
 
 logger = logging.getLogger(__name__)
 
+_FLOAT_RE = re.compile(r'\d+\.?\d*')
+_INT_RE = re.compile(r'\d+')
+# Anything but letters/digits (str.isalnum), space, '-' and '_'
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w \-]+')
+# Terms that make generate_recipe_image refuse the request
+_PROBLEMATIC_TERMS_RE = re.compile(r'nsfw|explicit|inappropriate', re.IGNORECASE)
+
+# Short keys the model is asked to answer with, and their canonical names.
+# Keeping the example compact roughly halves the prompt's token count. JSON mode emits
+# properties alphabetically, so name and description get a_/b_ prefixes to come out
+# first and let the streaming route start the image before the rest of the recipe.
+_RECIPE_KEYS = {
+    "a_nm": "name", "b_desc": "description", "prep": "prepTime", "cook": "cookTime",
+    "tot": "totalTime", "srv": "servings", "diff": "difficulty", "cui": "cuisine",
+    "ings": "ingredients", "ins": "instructions", "nut": "nutritionalInfo",
+    "tags": "tags", "tips": "tips",
+}
+_INGREDIENT_KEYS = {"n": "name", "a": "amount", "u": "unit"}
+_NUTRITION_KEYS = {"cal": "calories", "pro": "protein", "carb": "carbs", "fat": "fat", "fib": "fiber"}
+
+_RECIPE_EXAMPLE_JSON = json.dumps({
+    "a_nm": "Recipe Name", "b_desc": "Brief description", "prep": "15 minutes", "cook": "30 minutes",
+    "tot": "45 minutes", "srv": 4, "diff": "medium", "cui": "cuisine_type",
+    "ings": [{"n": "ingredient", "a": "quantity", "u": "unit"}],
+    "ins": ["Step 1: instruction"],
+    "nut": {"cal": 350, "pro": "25g", "carb": "30g", "fat": "15g", "fib": "5g"},
+    "tags": ["tag"], "tips": ["tip"],
+}, separators=(",", ":"))
+
+# Response schema for Gemini's JSON mode, mirroring the short-key example above
+_STRING = {"type": "STRING"}
+_STRING_LIST = {"type": "ARRAY", "items": _STRING}
+_RECIPE_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "a_nm": _STRING, "b_desc": _STRING, "prep": _STRING, "cook": _STRING, "tot": _STRING,
+        "srv": {"type": "INTEGER"}, "diff": _STRING, "cui": _STRING,
+        "ings": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"n": _STRING, "a": _STRING, "u": _STRING},
+                "required": ["n", "a", "u"],
+            },
+        },
+        "ins": _STRING_LIST,
+        "nut": {
+            "type": "OBJECT",
+            "properties": {"cal": {"type": "INTEGER"}, "pro": _STRING, "carb": _STRING, "fat": _STRING, "fib": _STRING},
+        },
+        "tags": _STRING_LIST,
+        "tips": _STRING_LIST,
+    },
+    "required": ["a_nm", "b_desc", "ings", "ins"],
+}
+
+# Each batched recipe carries the number of the request it answers, so a dropped or
+# reordered entry can't hand one user's recipe to another
+_RECIPE_BATCH_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"recipes": {"type": "ARRAY", "items": {
+        **_RECIPE_RESPONSE_SCHEMA,
+        "properties": {"idx": {"type": "INTEGER"}, **_RECIPE_RESPONSE_SCHEMA["properties"]},
+        "required": ["idx", *_RECIPE_RESPONSE_SCHEMA["required"]],
+    }}},
+    "required": ["recipes"],
+}
+
+# Variants requested by get_recipe_suggestions, in order
+_SUGGESTION_VARIANTS = (
+    {"difficulty": "easy", "cuisine": "American"},
+    {"difficulty": "medium", "cuisine": "Italian"},
+    {"difficulty": "medium", "cuisine": "Asian"},
+)
+
+_RECIPE_KEY_LEGEND = ", ".join(
+    f"{short}={full}"
+    for short, full in {**_RECIPE_KEYS, **_INGREDIENT_KEYS, **_NUTRITION_KEYS}.items()
+    if short != full
+)
+
+# Only the ingredients/preferences vary per request; the example JSON and key legend are baked in
+# (braces escaped) so a single str.format builds the prompt
+_RECIPE_PROMPT_TEMPLATE = (
+    "Create a practical, delicious recipe using these ingredients: {ingredients}\n"
+    "Use as many of them as possible. Difficulty: {difficulty}{restrictions}{cuisine}\n"
+    "Reply with only a JSON object shaped like this example: "
+    + _RECIPE_EXAMPLE_JSON.replace("{", "{{").replace("}", "}}")
+    + "\nKeys: " + _RECIPE_KEY_LEGEND
+)
+
+_MULTI_RECIPE_PROMPT_TEMPLATE = (
+    "Create {count} different practical, delicious recipes using these ingredients: {ingredients}\n"
+    "Use as many of them as possible. One recipe per variant, in this order:\n{variant_lines}\n"
+    "Reply with only a JSON object {{\"recipes\":[...]}} where each recipe has \"idx\" set to its request's number "
+    "and is otherwise shaped like this example: "
+    + _RECIPE_EXAMPLE_JSON.replace("{", "{{").replace("}", "}}")
+    + "\nKeys: " + _RECIPE_KEY_LEGEND
+)
+_VARIANT_LINE_TEMPLATE = "{index}. Difficulty: {difficulty}, cuisine: {cuisine}"
+
+_BATCH_RECIPE_PROMPT_TEMPLATE = (
+    "Create {count} separate practical, delicious recipes, one for each request below, in the same order. "
+    "Each recipe should use as many of its own request's ingredients as possible.\n{request_lines}\n"
+    "Reply with only a JSON object {{\"recipes\":[...]}} where each recipe has \"idx\" set to its request's number "
+    "and is otherwise shaped like this example: "
+    + _RECIPE_EXAMPLE_JSON.replace("{", "{{").replace("}", "}}")
+    + "\nKeys: " + _RECIPE_KEY_LEGEND
+)
+_BATCH_REQUEST_LINE_TEMPLATE = "{index}. Ingredients: {ingredients}. Difficulty: {difficulty}{restrictions}{cuisine}"
+
+_IMAGE_PROMPT_TEMPLATE = """Create a high-quality, professional food photography image of {name}.
+
+Description: {description}
+
+Style requirements:
+- Professional food photography with excellent lighting
+- Appetizing presentation on elegant dishware
+- Clean, modern plating with artistic arrangement
+- Warm, inviting colors that enhance appetite appeal
+- Sharp focus on the food with shallow depth of field
+- Minimal, clean background (white or neutral tones)
+- Restaurant-quality presentation
+- High resolution and crisp details
+- Family-friendly and appropriate content only
+
+The image should make the dish look absolutely delicious and appealing, perfect for a modern recipe application. Focus on the food presentation and avoid any inappropriate or non-food related content."""
+
+def _expand_keys(data: Dict[str, Any], keys: Dict[str, str]) -> Dict[str, Any]:
+    """Rename abbreviated keys to their canonical names, leaving unknown keys alone"""
+    return {keys.get(key, key): value for key, value in data.items()}
+
+def _dedupe_terms(terms: Optional[List[str]]) -> List[str]:
+    """Strip, lowercase and drop blank/duplicate entries, keeping first-seen order."""
+    return list(dict.fromkeys(t.strip().lower() for t in terms or () if t and t.strip()))
+
+@lru_cache(maxsize=256)
+def _pantry_matcher(available_lower: frozenset) -> tuple:
+    """
+    For _find_missing_ingredients: one haystack answers "is the required name inside any
+    available name", and one alternation regex answers "is any available name inside the
+    required name". Cached because the same pantry is checked again for every recipe.
+    """
+    haystack = "\n".join(sorted(available_lower))
+    return haystack, re.compile("|".join(map(re.escape, available_lower)))
+
+_WEBP_QUALITY = 85
+# libwebp effort, 0 (fastest) to 6 (smallest). 2 encodes about twice as fast as the
+# default 4 for a few percent larger files, which suits a one-off upload
+_WEBP_METHOD = 2
+# Encode buffer per worker thread, reused across _to_webp calls instead of regrown each time
+_webp_buffers = threading.local()
+
+def _image_format(data: bytes) -> tuple:
+    """(file extension, MIME type) for encoded image bytes, sniffed from the signature"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    if data[:3] == JPEG_SIGNATURE:
+        return "jpg", "image/jpeg"
+    return "png", "image/png"
+
+def _to_webp(data: bytes) -> bytes:
+    """Re-encode an image as WebP (quality 85); returns the input unchanged if that fails or isn't smaller"""
+    buf = getattr(_webp_buffers, "buf", None)
+    if buf is None:
+        buf = _webp_buffers.buf = BytesIO()
+    buf.seek(0)
+    buf.truncate()
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image.convert("RGB").save(buf, "WEBP", quality=_WEBP_QUALITY, method=_WEBP_METHOD)
+    except Exception as e:
+        logger.warning("WebP conversion failed, keeping original image: %s", e)
+        return data
+    webp = buf.getvalue()
+    return webp if len(webp) < len(data) else data
+
+def _expand_recipe_keys(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a short-key recipe from the model into the canonical recipe schema"""
+    recipe = _expand_keys(recipe, _RECIPE_KEYS)
+    ingredients = recipe.get("ingredients")
+    if isinstance(ingredients, list):
+        recipe["ingredients"] = [
+            _expand_keys(ing, _INGREDIENT_KEYS) if isinstance(ing, dict) else ing
+            for ing in ingredients
+        ]
+    if isinstance(recipe.get("nutritionalInfo"), dict):
+        recipe["nutritionalInfo"] = _expand_keys(recipe["nutritionalInfo"], _NUTRITION_KEYS)
+    return recipe
+
+_DIFFICULTY_MAP = MappingProxyType({
+    "easy": DifficultyLevel.EASY,
+    "medium": DifficultyLevel.MEDIUM,
+    "hard": DifficultyLevel.HARD
+})
+
+# Defaults for fields missing from a model response. Immutable ones can be shared as-is;
+# containers come from factories so no two recipes ever share a default list/dict
+_REQUIRED_SCALAR_DEFAULTS = (
+    ('name', 'Untitled Recipe'),
+    ('description', 'A delicious recipe'),
+    ('prepTime', '15 minutes'),
+    ('cookTime', '30 minutes'),
+    ('totalTime', '45 minutes'),
+    ('servings', 4),
+    ('difficulty', 'medium'),
+    ('cuisine', 'International'),
+)
+_DEFAULT_NUTRITION = MappingProxyType({
+    'calories': 0,
+    'protein': '0g',
+    'carbs': '0g',
+    'fat': '0g',
+    'fiber': '0g'
+})
+_REQUIRED_CONTAINER_DEFAULTS = (
+    ('ingredients', list),
+    ('instructions', list),
+    ('nutritionalInfo', lambda: dict(_DEFAULT_NUTRITION)),
+    ('tags', list),
+    ('tips', list),
+)
+
+_RECIPE_REQUIRED_KEYS = frozenset(field for field, _ in _REQUIRED_SCALAR_DEFAULTS + _REQUIRED_CONTAINER_DEFAULTS)
+_INGREDIENT_FIELDS = frozenset(('name', 'amount', 'unit'))
+
+def _has_canonical_shape(recipe: Dict[str, Any]) -> bool:
+    """True when remediation would leave `recipe` unchanged (list fields are lists, ingredients are clean dicts)"""
+    return (
+        type(recipe['instructions']) is list
+        and type(recipe['tags']) is list
+        and type(recipe['tips']) is list
+        and type(recipe['ingredients']) is list
+        and all(type(i) is dict and i.keys() == _INGREDIENT_FIELDS for i in recipe['ingredients'])
+    )
+
+# Transient Gemini errors worth retrying before falling back to the mock
+_RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+
+# Static parts of the mock recipes, built once; per-call values are layered on top
+_MOCK_RECIPE_TEMPLATE = MappingProxyType({
+    "prepTime": "15 minutes",
+    "cookTime": "25 minutes",
+    "totalTime": "40 minutes",
+    "servings": 4,
+    "difficulty": "medium",
+})
+_MOCK_INSTRUCTIONS = (
+    "Prepare all ingredients by washing and chopping as needed.",
+    "Cook for 5-7 minutes until tender.",
+    "Add remaining ingredients and seasonings.",
+    "Cook for an additional 15-20 minutes until everything is well combined.",
+    "Taste and adjust seasoning as needed.",
+    "Serve hot and enjoy!",
+)
+_MOCK_NUTRITION = MappingProxyType({
+    "calories": 320,
+    "protein": "18g",
+    "carbs": "35g",
+    "fat": "12g",
+    "fiber": "6g",
+})
+_MOCK_TAGS = ("healthy", "easy", "quick")
+_MOCK_TIPS = (
+    "Make sure to taste and adjust seasoning throughout cooking.",
+    "This recipe can be easily doubled for larger servings.",
+    "Store leftovers in the refrigerator for up to 3 days.",
+)
+
+# The legacy mock's leaf models are frozen, so the static ones can be shared
+_MOCK_LEGACY_SALT = RecipeIngredient(name="Salt", quantity=1.0, unit="tsp", optional=False)
+_MOCK_LEGACY_STEPS = (
+    RecipeStep(step_number=2, instruction="Heat a pan over medium heat and add the main ingredients", duration_minutes=10),
+    RecipeStep(step_number=3, instruction="Cook until tender and season with salt to taste", duration_minutes=15),
+    RecipeStep(step_number=4, instruction="Serve hot and enjoy!", duration_minutes=2),
+)
+_MOCK_LEGACY_NUTRITION = NutritionInfo(calories=320, protein_g=18.0, carbs_g=35.0, fat_g=12.0, fiber_g=6.0)
+
 class GeminiService:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.flash_model = genai.GenerativeModel('gemini-1.5-flash')
-            self.vision_model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            # Initialize Gemini 2.0 client for image generation
-            self.genai_client = genai_client.Client(api_key=self.api_key)
-        else:
+        if not self.api_key:
             logger.warning("GEMINI_API_KEY not found. Using mock implementation.")
-            self.flash_model = None
-            self.vision_model = None
-            self.genai_client = None
+
+        self.flash_model = None
+        self.vision_model = None
+        self._recipe_gen_config = None
+        self._recipe_batch_gen_config = None
+        if self.api_key:
+            configure_genai(self.api_key)
+            # Safety settings are kept at medium so ordinary food content isn't blocked. They're
+            # attached to the models so the SDK normalizes them once rather than on every request
+            safety_settings = MappingProxyType({
+                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+            })
+            self.flash_model = genai.GenerativeModel('gemini-1.5-flash', safety_settings=safety_settings)
+            self.vision_model = genai.GenerativeModel('gemini-2.0-flash-exp', safety_settings=safety_settings)
+
+            # Request configs are immutable, so build them once instead of per call. They're kept
+            # in the SDK's normalized dict form (response_schema already a protos.Schema), which
+            # it otherwise rebuilds from the GenerationConfig dataclass on every request
+            self._recipe_gen_config = generation_types.to_generation_config_dict(genai.types.GenerationConfig(
+                temperature=0.7,
+                max_output_tokens=2000,
+                response_mime_type="application/json",
+                response_schema=_RECIPE_RESPONSE_SCHEMA,
+            ))
+            self._recipe_batch_gen_config = generation_types.to_generation_config_dict(genai.types.GenerationConfig(
+                temperature=0.7,
+                max_output_tokens=2000 * max(len(_SUGGESTION_VARIANTS), settings.GEMINI_RECIPE_BATCH_SIZE),
+                response_mime_type="application/json",
+                response_schema=_RECIPE_BATCH_RESPONSE_SCHEMA,
+            ))
+
+        # The Gemini 2.0 image client (google.genai) is only needed for recipe images and
+        # is slow to import, so it is loaded on first use (see genai_client)
+        self._genai_client = None
+        self._image_gen_config = None
+
+        # Caps in-flight Gemini calls so concurrent callers (e.g. suggestions) don't trip rate limits
+        self._request_semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENT_REQUESTS)
+        # ...and paces them (retries included) under the per-minute quota
+        self._rate_limiter = AsyncRateLimiter(settings.GEMINI_MAX_REQUESTS_PER_MINUTE, 60)
+
+        # Validated recipes keyed by normalized inputs, plus the calls currently in flight
+        # so identical concurrent requests share one Gemini round trip
+        self._recipe_cache = TTLCache(maxsize=4096, ttl=3600)
+        # Uploaded image URLs keyed by normalized recipe name/description
+        self._image_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._inflight_recipes: Dict[tuple, asyncio.Future] = {}
+        self._inflight_images: Dict[tuple, asyncio.Future] = {}
+        self._image_waiters: Dict[asyncio.Future, int] = {}
+
+        # generate_recipe calls waiting to be sent together (see _enqueue_recipe)
+        self._pending_recipes: List[tuple] = []
+        self._recipe_batch_timer: Optional[asyncio.TimerHandle] = None
+        self._recipe_batch_tasks: set = set()
+
+    @property
+    def genai_client(self):
+        """Client for Gemini 2.0 image generation, created on first use (None without an API key)."""
+        if self._genai_client is None and self.api_key:
+            import google.genai as genai_client
+            from google.genai import types
+            self._image_gen_config = types.GenerateContentConfig(
+                response_modalities=['TEXT', 'IMAGE']
+            )
+            self._genai_client = genai_client.Client(api_key=self.api_key)
+        return self._genai_client
+
+    @genai_client.setter
+    def genai_client(self, client):
+        self._genai_client = client
+
+    async def _generate_content(self, prompt: str, generation_config, stream: bool = False):
+        """
+        generate_content_async with jittered exponential backoff on rate-limit (429) and
+        unavailable (503) errors, so transient failures don't fall straight through to the mock.
+        """
+        async def call():
+            await self._rate_limiter.acquire()
+            return await self.flash_model.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                stream=stream
+            )
+
+        return await retry_async(call, _RETRYABLE_ERRORS, attempts=settings.GEMINI_MAX_ATTEMPTS)
 
     def _create_recipe_prompt(self, ingredients: List[str], dietary_restrictions: List[str] = None, 
                             cuisine_preference: str = None, difficulty: str = "medium") -> str:
         """Create the prompt for recipe generation."""
-        restrictions_text = ""
-        if dietary_restrictions:
-            restrictions_text = f"\nDietary restrictions: {', '.join(dietary_restrictions)}"
-        
-        cuisine_text = ""
-        if cuisine_preference:
-            cuisine_text = f"\nCuisine preference: {cuisine_preference}"
-            
-        return f"""
-        Create a detailed recipe using the following available ingredients: {', '.join(ingredients)}
-        
-        Requirements:
-        - Use as many of the provided ingredients as possible
-        - Difficulty level: {difficulty}
-        {restrictions_text}
-        {cuisine_text}
-        
-        Return the recipe as a JSON object with this exact structure:
-        {{
-            "name": "Recipe Name",
-            "description": "Brief description of the dish",
-            "prepTime": "15 minutes",
-            "cookTime": "30 minutes",
-            "totalTime": "45 minutes",
-            "servings": 4,
-            "difficulty": "medium",
-            "cuisine": "cuisine_type",
-            "ingredients": [
-                {{
-                    "name": "ingredient_name",
-                    "amount": "quantity",
-                    "unit": "unit_of_measurement"
-                }}
-            ],
-            "instructions": [
-                "Step 1: Detailed instruction",
-                "Step 2: Detailed instruction"
-            ],
-            "nutritionalInfo": {{
-                "calories": 350,
-                "protein": "25g",
-                "carbs": "30g",
-                "fat": "15g",
-                "fiber": "5g"
-            }},
-            "tags": ["tag1", "tag2", "tag3"],
-            "tips": [
-                "Helpful tip 1",
-                "Helpful tip 2"
-            ]
-        }}
-        
-        Make sure the recipe is practical, delicious, and uses the ingredients efficiently.
-        """
+        return _RECIPE_PROMPT_TEMPLATE.format(
+            ingredients=", ".join(ingredients),
+            difficulty=difficulty,
+            restrictions=f"\nDietary restrictions: {', '.join(dietary_restrictions)}" if dietary_restrictions else "",
+            cuisine=f"\nCuisine preference: {cuisine_preference}" if cuisine_preference else "",
+        )
+
+    def _create_multi_recipe_prompt(self, ingredients: List[str], variants: List[Dict[str, str]]) -> str:
+        """Create one prompt asking for several recipe variants at once."""
+        variant_lines = "\n".join(
+            _VARIANT_LINE_TEMPLATE.format(index=i, **variant)
+            for i, variant in enumerate(variants, 1)
+        )
+        return _MULTI_RECIPE_PROMPT_TEMPLATE.format(
+            count=len(variants),
+            ingredients=", ".join(ingredients),
+            variant_lines=variant_lines,
+        )
 
     async def generate_recipe(self, ingredients: List[str], dietary_restrictions: List[str] = None,
                             cuisine_preference: str = None, difficulty: str = "medium") -> Dict[str, Any]:
@@ -111,51 +443,252 @@ class GeminiService:
         if not self.flash_model:
             return self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
 
+        # Upstream extraction often repeats items; duplicates only cost prompt tokens
+        ingredients = _dedupe_terms(ingredients)
+        dietary_restrictions = _dedupe_terms(dietary_restrictions)
+        key = self._recipe_cache_key(ingredients, dietary_restrictions, cuisine_preference, difficulty)
+        recipe = self._recipe_cache.get(key)
+        if recipe is None:
+            inflight = self._inflight_recipes.get(key)
+            if inflight is None:
+                inflight = self._enqueue_recipe(key, ingredients, dietary_restrictions, cuisine_preference, difficulty)
+                self._inflight_recipes[key] = inflight
+                inflight.add_done_callback(lambda _: self._inflight_recipes.pop(key, None))
+            recipe = await asyncio.shield(inflight)
+            if recipe is None:
+                return self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+
+        # Callers mutate the dict they get back, so never hand out the cached object
+        return copy.deepcopy(recipe)
+
+    @staticmethod
+    def _recipe_cache_key(ingredients: List[str], dietary_restrictions: List[str] = None,
+                          cuisine_preference: str = None, difficulty: str = "medium") -> tuple:
+        return (
+            tuple(sorted(i.lower() for i in ingredients)),
+            tuple(sorted(r.lower() for r in dietary_restrictions or ())),
+            (cuisine_preference or "").lower(),
+            difficulty,
+        )
+
+    async def generate_recipe_stream(self, ingredients: List[str], dietary_restrictions: List[str] = None,
+                                     cuisine_preference: str = None, difficulty: str = "medium") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a recipe while Gemini is still generating it.
+        
+        Yields best-effort partial recipe dicts (canonical keys, fields may be missing or
+        incomplete) as chunks arrive, and always finishes with the complete validated recipe,
+        so callers can start on e.g. the image as soon as the name is known.
+        Unlike generate_recipe this never goes through the batcher (a batched call can't be
+        streamed), but identical concurrent requests still share one generation.
+        """
+        if not self.flash_model:
+            yield self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+            return
+
+        # Upstream extraction often repeats items; duplicates only cost prompt tokens
+        ingredients = _dedupe_terms(ingredients)
+        dietary_restrictions = _dedupe_terms(dietary_restrictions)
+        key = self._recipe_cache_key(ingredients, dietary_restrictions, cuisine_preference, difficulty)
+        cached = self._recipe_cache.get(key)
+        if cached is None:
+            inflight = self._inflight_recipes.get(key)
+            if inflight is not None:
+                # The same recipe is already being generated (streamed or batched); wait for it
+                # rather than paying for a second call, at the cost of no partial results
+                cached = await asyncio.shield(inflight)
+                if cached is None:
+                    yield self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+                    return
+        if cached is not None:
+            yield copy.deepcopy(cached)
+            return
+
+        # Let identical requests arriving while this streams wait for its result
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight_recipes[key] = shared
+        shared.add_done_callback(lambda _: self._inflight_recipes.pop(key, None))
+        try:
+            async for recipe in self._stream_recipe(key, ingredients, dietary_restrictions,
+                                                    cuisine_preference, difficulty):
+                yield recipe
+        finally:
+            # Only a complete recipe gets cached, so anything else resolves waiters to None (the mock)
+            if not shared.done():
+                shared.set_result(self._recipe_cache.get(key))
+
+    async def _stream_recipe(self, key: tuple, ingredients: List[str], dietary_restrictions: List[str],
+                             cuisine_preference: str, difficulty: str) -> AsyncIterator[Dict[str, Any]]:
+        """The Gemini call behind generate_recipe_stream; caches the final recipe on success."""
+        buffer = JsonStreamBuffer()
         try:
             prompt = self._create_recipe_prompt(ingredients, dietary_restrictions, cuisine_preference, difficulty)
-            
-            # Configure safety settings to be less restrictive for food content
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            }
-            
-            response = self.flash_model.generate_content(
-                prompt,
-                safety_settings=safety_settings,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=2000,
-                )
+            async with self._request_semaphore:
+                response = await self._generate_content(prompt, self._recipe_gen_config, stream=True)
+                async for chunk in response:
+                    if buffer.feed(chunk.text):
+                        # The object is complete; don't wait for whatever the model sends after it
+                        break
+                    try:
+                        partial = orjson.loads(repair_json(buffer.text))
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(partial, dict):
+                        yield _expand_recipe_keys(partial)
+        except Exception as e:
+            # Whatever arrived before the failure is a truncated recipe; don't serve or cache it
+            logger.error("Error streaming recipe from Gemini: %s", e)
+            yield self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+            return
+
+        try:
+            recipe = loads_lenient(buffer.text) if buffer.text else None
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse streamed Gemini response: %s", e)
+            recipe = None
+
+        if not isinstance(recipe, dict):
+            yield self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+            return
+
+        recipe = self._validate_recipe_structure(recipe)
+        self._recipe_cache.set(key, recipe)
+        yield copy.deepcopy(recipe)
+
+    def _enqueue_recipe(self, key: tuple, *args) -> asyncio.Future:
+        """
+        Queue a recipe request and return a future for its result (None on failure).
+        With no batch in flight a lone request is sent straight away. Otherwise requests are
+        flushed as one Gemini call once GEMINI_RECIPE_BATCH_SIZE are waiting or
+        GEMINI_RECIPE_BATCH_WINDOW_MS after the first one arrived, whichever is sooner.
+        """
+        if settings.GEMINI_RECIPE_BATCH_SIZE <= 1:
+            return asyncio.ensure_future(self._request_recipe(key, *args))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_recipes.append((key, args, future))
+        if len(self._pending_recipes) == 1 and not self._recipe_batch_tasks:
+            # Nothing else is going on, so there is nothing to wait for
+            self._flush_recipe_batch()
+        elif len(self._pending_recipes) >= settings.GEMINI_RECIPE_BATCH_SIZE:
+            self._flush_recipe_batch()
+        elif self._recipe_batch_timer is None:
+            self._recipe_batch_timer = loop.call_later(
+                settings.GEMINI_RECIPE_BATCH_WINDOW_MS / 1000, self._flush_recipe_batch
+            )
+        return future
+
+    def _flush_recipe_batch(self) -> None:
+        if self._recipe_batch_timer is not None:
+            self._recipe_batch_timer.cancel()
+            self._recipe_batch_timer = None
+        batch, self._pending_recipes = self._pending_recipes, []
+        if batch:
+            task = asyncio.ensure_future(self._run_recipe_batch(batch))
+            # Hold a reference so the task isn't garbage collected mid-flight
+            self._recipe_batch_tasks.add(task)
+            task.add_done_callback(self._recipe_batch_tasks.discard)
+
+    async def _run_recipe_batch(self, batch: List[tuple]) -> None:
+        """
+        Resolve each queued future, falling back to single requests for slots the batch reply
+        left out. If the batch call itself fails every future gets None (the mock).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        try:
+            if len(batch) == 1:
+                results[0] = await self._request_recipe(batch[0][0], *batch[0][1])
+                return
+            try:
+                results = await self._request_recipe_batch(batch)
+            except Exception as e:
+                # Retrying each request on its own would multiply quota use on exactly the
+                # errors (rate limits, outages) most likely to have failed the batch
+                logger.error("Error generating batched recipes: %s", e)
+                return
+            missing = [i for i, recipe in enumerate(results) if recipe is None]
+            fallbacks = await asyncio.gather(*[
+                self._request_recipe(batch[i][0], *batch[i][1]) for i in missing
+            ])
+            for i, recipe in zip(missing, fallbacks):
+                results[i] = recipe
+        finally:
+            for (_, _, future), recipe in zip(batch, results):
+                if not future.done():
+                    future.set_result(recipe)
+
+    async def _request_recipe_batch(self, batch: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+        """Ask for several queued recipes in one Gemini call; unfilled slots are None, errors propagate."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        request_lines = "\n".join(
+            _BATCH_REQUEST_LINE_TEMPLATE.format(
+                index=i,
+                ingredients=", ".join(ingredients),
+                difficulty=difficulty,
+                restrictions=f". Dietary restrictions: {', '.join(restrictions)}" if restrictions else "",
+                cuisine=f". Cuisine preference: {cuisine}" if cuisine else "",
             )
+            for i, (_, (ingredients, restrictions, cuisine, difficulty), _) in enumerate(batch, 1)
+        )
+        prompt = _BATCH_RECIPE_PROMPT_TEMPLATE.format(count=len(batch), request_lines=request_lines)
+        async with self._request_semaphore:
+            response = await self._generate_content(prompt, self._recipe_batch_gen_config)
+        data = loads_lenient(response.text)
+        recipes = data.get("recipes", []) if isinstance(data, dict) else []
+        by_index: Dict[int, Dict[str, Any]] = {}
+        duplicates = set()
+        for recipe in recipes:
+            if not isinstance(recipe, dict):
+                continue
+            index = recipe.pop("idx", None)
+            if not isinstance(index, int) or not 1 <= index <= len(batch):
+                continue
+            if index in by_index:
+                duplicates.add(index)
+            by_index[index] = recipe
+        # An index answered twice is ambiguous, so those requests fall back to a single call too
+        for index, recipe in by_index.items():
+            if index in duplicates:
+                continue
+            recipe = self._validate_recipe_structure(recipe)
+            self._recipe_cache.set(batch[index - 1][0], recipe)
+            results[index - 1] = recipe
+        return results
+
+    async def _request_recipe(self, key: tuple, ingredients: List[str], dietary_restrictions: List[str] = None,
+                              cuisine_preference: str = None, difficulty: str = "medium") -> Optional[Dict[str, Any]]:
+        """Call Gemini for a recipe and cache it; returns None if the call or parsing fails."""
+        try:
+            prompt = self._create_recipe_prompt(ingredients, dietary_restrictions, cuisine_preference, difficulty)
             
-            # Parse the JSON response
-            content = response.text
+            # Stream the response so we can stop reading as soon as the JSON object closes
+            buffer = JsonStreamBuffer()
+            async with self._request_semaphore:
+                response = await self._generate_content(prompt, self._recipe_gen_config, stream=True)
+                async for chunk in response:
+                    if buffer.feed(chunk.text):
+                        break
             
+            # JSON mode should give a single JSON object; repair it if the output was truncated
             try:
-                # Find JSON object in the response
-                start_idx = content.find('{')
-                end_idx = content.rfind('}') + 1
-                
-                if start_idx != -1 and end_idx != 0:
-                    json_str = content[start_idx:end_idx]
-                    recipe = json.loads(json_str)
-                    
-                    # Validate and clean the recipe structure
-                    return self._validate_recipe_structure(recipe)
-                else:
-                    logger.error("No valid JSON object found in Gemini response")
-                    return self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
-                    
+                recipe = loads_lenient(buffer.text)
             except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON from Gemini response: {e}")
-                return self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+                logger.error("Failed to parse JSON from Gemini response: %s", e)
+                return None
+            
+            if not isinstance(recipe, dict):
+                logger.error("Gemini response was not a JSON object")
+                return None
+            
+            # Light safety net: expand short keys and fill any missing fields
+            recipe = self._validate_recipe_structure(recipe)
+            self._recipe_cache.set(key, recipe)
+            return recipe
 
         except Exception as e:
-            logger.error(f"Error calling Gemini API for recipe generation: {e}")
-            return self._mock_recipe_generation(ingredients, dietary_restrictions, cuisine_preference)
+            logger.error("Error calling Gemini API for recipe generation: %s", e)
+            return None
 
     async def generate_recipe_image(self, recipe_name: str, recipe_description: str) -> Optional[str]:
         """
@@ -168,35 +701,68 @@ class GeminiService:
         Returns:
             URL of the generated image (saved locally) or None if failed
         """
-        logger.info(f"GEMINI IMAGE DEBUG: Starting image generation for recipe: {recipe_name}")
+        logger.info("GEMINI IMAGE DEBUG: Starting image generation for recipe: %s", recipe_name)
         
         # Validate inputs first
         if not self._validate_image_generation_inputs(recipe_name, recipe_description):
-            logger.error(f"GEMINI IMAGE DEBUG: Invalid inputs for image generation: recipe_name='{recipe_name}', description='{recipe_description}'")
+            logger.error("GEMINI IMAGE DEBUG: Invalid inputs for image generation: recipe_name='%s', description='%s'", recipe_name, recipe_description)
             return self._mock_image_generation()
         
         if not self.genai_client:
             logger.warning("GEMINI IMAGE DEBUG: Gemini client not available, using mock image generation")
             return self._mock_image_generation()
 
+        image_key = (recipe_name.strip().lower(), (recipe_description or "").strip().lower())
+        cached_url = self._image_cache.get(image_key)
+        if cached_url is not None:
+            logger.info("GEMINI IMAGE DEBUG: Reusing cached image for recipe: %s", recipe_name)
+            return cached_url
+
+        # Identical concurrent requests (e.g. the same suggestion shown to several users) share one generation
+        inflight = self._inflight_images.get(image_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._request_recipe_image(image_key, recipe_name, recipe_description))
+            self._inflight_images[image_key] = inflight
+            self._image_waiters[inflight] = 0
+            inflight.add_done_callback(self._discard_inflight_image(image_key))
+        self._image_waiters[inflight] += 1
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            # The shield keeps one caller's cancellation from failing the others, but once the
+            # last one is gone there's no point finishing the generation and upload
+            if self._image_waiters.get(inflight) == 1:
+                inflight.cancel()
+            raise
+        finally:
+            if inflight in self._image_waiters:
+                self._image_waiters[inflight] -= 1
+
+    def _discard_inflight_image(self, image_key: tuple):
+        def discard(future: asyncio.Future) -> None:
+            if self._inflight_images.get(image_key) is future:
+                del self._inflight_images[image_key]
+            self._image_waiters.pop(future, None)
+        return discard
+
+    async def _request_recipe_image(self, image_key: tuple, recipe_name: str, recipe_description: str) -> str:
+        """Generate, upload and cache an image for a recipe; falls back to a mock image on failure."""
         try:
             # Create a safe, well-structured prompt
             prompt = self._create_safe_image_prompt(recipe_name, recipe_description)
             
-            logger.info(f"GEMINI IMAGE DEBUG: About to call Gemini API for recipe: {recipe_name}")
-            logger.debug(f"Using prompt: {prompt[:100]}...")
+            logger.info("GEMINI IMAGE DEBUG: About to call Gemini API for recipe: %s", recipe_name)
+            logger.debug("Using prompt: %.100s...", prompt)
             
             # Use Gemini 2.0 image generation API with error handling
             try:
-                response = self.genai_client.models.generate_content(
+                response = await self.genai_client.aio.models.generate_content(
                     model="gemini-2.0-flash-preview-image-generation",
                     contents=prompt,
-                    config=types.GenerateContentConfig(
-                        response_modalities=['TEXT', 'IMAGE']
-                    )
+                    config=self._image_gen_config
                 )
             except Exception as api_error:
-                logger.error(f"Gemini API call failed: {api_error}")
+                logger.error("Gemini API call failed: %s", api_error)
                 return self._mock_image_generation()
             
             # Validate response structure
@@ -209,97 +775,92 @@ class GeminiService:
             for part in response.candidates[0].content.parts:
                 if part.inline_data is not None:
                     try:
-                        # Convert image data to PIL Image
-                        image = Image.open(BytesIO(part.inline_data.data))
+                        # Gemini already returns an encoded image, so upload those bytes as-is
+                        # rather than decoding and re-encoding them through PIL and a temp file
+                        image_bytes = part.inline_data.data
+                        image_size = image_dimensions(image_bytes)
                         
                         # Validate image
-                        if image.size[0] < 100 or image.size[1] < 100:
-                            logger.warning(f"Generated image too small: {image.size}")
+                        if image_size[0] < 100 or image_size[1] < 100:
+                            logger.warning("Generated image too small: %s", image_size)
                             continue
                         
-                        # Create images directory if it doesn't exist
-                        images_dir = "generated_images"
-                        os.makedirs(images_dir, exist_ok=True)
+                        logger.info("Successfully generated image for recipe: %s (size: %s)", recipe_name, image_size)
                         
-                        # Generate safe filename
-                        safe_name = "".join(c for c in recipe_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                        safe_name = safe_name.replace(' ', '_').lower()[:50]  # Limit length
-                        image_filename = f"recipe_{uuid.uuid4().hex[:8]}_{safe_name}.png"
-                        image_path = os.path.join(images_dir, image_filename)
+                        # Food photos are several times smaller as WebP than as Gemini's PNG
+                        image_bytes = await asyncio.to_thread(_to_webp, image_bytes)
                         
-                        # Save the image with error handling
-                        image.save(image_path, "PNG", optimize=True)
-                        
-                        # Verify file was saved successfully
-                        if os.path.exists(image_path) and os.path.getsize(image_path) > 0:
-                            logger.info(f"Successfully generated and saved image: {image_path} (size: {image.size})")
+                        # Upload to Firebase Storage
+                        try:
+                            # Generate a unique recipe ID for the upload
+                            recipe_id = uuid.uuid4().hex[:12]
+                            logger.info("FIREBASE UPLOAD DEBUG: Starting Firebase upload, recipe_id: %s", recipe_id)
+                            
+                            extension, content_type = _image_format(image_bytes)
+                            firebase_url = await firebase_storage_service.upload_recipe_image(
+                                image_data=image_bytes,
+                                recipe_id=recipe_id,
+                                extension=extension,
+                                content_type=content_type
+                            )
                             
-                            # Upload to Firebase Storage
-                            try:
-                                logger.info(f"FIREBASE UPLOAD DEBUG: Starting Firebase upload for image: {image_path}")
-                                
-                                # Read the image file as bytes
-                                with open(image_path, 'rb') as img_file:
-                                    image_bytes = img_file.read()
-                                
-                                # Generate a unique recipe ID for the upload
-                                recipe_id = uuid.uuid4().hex[:12]
-                                logger.info(f"FIREBASE UPLOAD DEBUG: Generated recipe_id for upload: {recipe_id}")
-                                
-                                # Upload to Firebase Storage
-                                firebase_url = await firebase_storage_service.upload_recipe_image(
-                                    image_data=image_bytes,
-                                    recipe_id=recipe_id
-                                )
-                                
-                                if firebase_url:
-                                    logger.info(f"FIREBASE UPLOAD DEBUG: Successfully uploaded image to Firebase Storage: {firebase_url}")
-                                    
-                                    # Clean up local file after successful upload
-                                    try:
-                                        os.remove(image_path)
-                                        logger.info(f"FIREBASE UPLOAD DEBUG: Cleaned up local image file: {image_path}")
-                                    except Exception as cleanup_error:
-                                        logger.warning(f"FIREBASE UPLOAD DEBUG: Failed to clean up local file {image_path}: {cleanup_error}")
-                                    
-                                    image_saved = True
-                                    logger.info(f"GEMINI IMAGE DEBUG: Returning Firebase URL for recipe: {recipe_name}")
-                                    return firebase_url
-                                else:
-                                    logger.error("Firebase Storage upload returned None - falling back to local path")
-                                    # Fall back to local path if Firebase upload fails
-                                    image_saved = True
-                                    return f"/{image_path}"
-                                    
-                            except Exception as upload_error:
-                                logger.error(f"Failed to upload image to Firebase Storage: {upload_error}")
-                                # Fall back to local path if Firebase upload fails
-                                logger.info(f"Falling back to local path: /{image_path}")
+                            if firebase_url:
+                                logger.info("FIREBASE UPLOAD DEBUG: Successfully uploaded image to Firebase Storage: %s", firebase_url)
                                 image_saved = True
-                                return f"/{image_path}"
-                        else:
-                            logger.error(f"Failed to save image file: {image_path}")
+                                self._image_cache.set(image_key, firebase_url)
+                                logger.info("GEMINI IMAGE DEBUG: Returning Firebase URL for recipe: %s", recipe_name)
+                                return firebase_url
+                            logger.error("Firebase Storage upload returned None - falling back to local path")
+                        except Exception as upload_error:
+                            logger.error("Failed to upload image to Firebase Storage: %s", upload_error)
+                        
+                        # Fall back to a local file only when the upload failed
+                        image_path = await asyncio.to_thread(self._save_image_locally, recipe_name, image_bytes)
+                        if image_path:
+                            logger.info("Falling back to local path: /%s", image_path)
+                            image_saved = True
+                            return f"/{image_path}"
                             
                     except Exception as img_error:
-                        logger.error(f"Error processing image data: {img_error}")
+                        logger.error("Error processing image data: %s", img_error)
                         continue
                         
                 elif part.text is not None:
-                    logger.info(f"Generated image description: {part.text[:100]}...")
+                    logger.info("Generated image description: %.100s...", part.text)
             
             if not image_saved:
                 logger.warning("No valid image data found in Gemini response")
                 return self._mock_image_generation()
             
         except Exception as e:
-            logger.error(f"Unexpected error in generate_recipe_image: {e}", exc_info=True)
+            logger.error("Unexpected error in _request_recipe_image: %s", e, exc_info=True)
             # Fall back to mock generation on error
             return self._mock_image_generation()
         
         # Should not reach here, but just in case
-        logger.error("Reached end of generate_recipe_image without returning")
+        logger.error("Reached end of _request_recipe_image without returning")
         return self._mock_image_generation()
 
+    def _save_image_locally(self, recipe_name: str, image_bytes: bytes) -> Optional[str]:
+        """Write image bytes under generated_images/; returns the path, or None if it couldn't be saved."""
+        # Create images directory if it doesn't exist
+        images_dir = "generated_images"
+        os.makedirs(images_dir, exist_ok=True)
+        
+        # Generate safe filename
+        safe_name = _UNSAFE_FILENAME_CHARS_RE.sub('', recipe_name).strip()
+        safe_name = safe_name.replace(' ', '_').lower()[:50]  # Limit length
+        extension, _ = _image_format(image_bytes)
+        image_path = os.path.join(images_dir, f"recipe_{uuid.uuid4().hex[:8]}_{safe_name}.{extension}")
+        
+        try:
+            with open(image_path, 'wb') as img_file:
+                img_file.write(image_bytes)
+        except OSError as e:
+            logger.error("Failed to save image file %s: %s", image_path, e)
+            return None
+        return image_path
+
     # Legacy method for compatibility with existing recipe_generator.py interface
     async def generate_recipe_legacy(self, request: RecipeGenerationRequest) -> Dict[str, Any]:
         """
@@ -331,38 +892,39 @@ class GeminiService:
             }
             
         except Exception as e:
-            logger.error(f"Error in legacy recipe generation: {e}")
+            logger.error("Error in legacy recipe generation: %s", e)
             return await self._mock_recipe_generation_legacy(request)
 
     def _dict_to_recipe_create(self, recipe_dict: Dict[str, Any], request: RecipeGenerationRequest) -> RecipeCreate:
         """Convert recipe dictionary to RecipeCreate object."""
         
-        # Parse ingredients
-        ingredients = []
-        for ing_data in recipe_dict.get("ingredients", []):
-            ingredient = RecipeIngredient(
-                name=ing_data["name"],
-                quantity=self._parse_quantity(ing_data["amount"]),
-                unit=ing_data["unit"],
+        # The dict was already normalized by _validate_recipe_structure and the parse helpers
+        # return the right types, so build the leaf models without re-running validation.
+        # Each list is walked once, with the per-item callables bound to locals up front
+        construct_ingredient = RecipeIngredient.model_construct
+        parse_quantity = self._parse_quantity
+        intern = sys.intern
+        ingredients = [
+            construct_ingredient(
+                name=intern(str(ing_data["name"])),
+                quantity=parse_quantity(ing_data["amount"]),
+                unit=intern(str(ing_data["unit"])),
                 optional=False
             )
-            ingredients.append(ingredient)
+            for ing_data in recipe_dict.get("ingredients", ())
+        ]
         
-        # Parse steps
-        steps = []
-        for i, instruction in enumerate(recipe_dict.get("instructions", [])):
-            step = RecipeStep(
-                step_number=i + 1,
-                instruction=instruction,
-                duration_minutes=None
-            )
-            steps.append(step)
+        construct_step = RecipeStep.model_construct
+        steps = [
+            construct_step(step_number=i, instruction=str(instruction), duration_minutes=None)
+            for i, instruction in enumerate(recipe_dict.get("instructions", ()), 1)
+        ]
         
         # Parse nutrition info
         nutrition = None
         if recipe_dict.get("nutritionalInfo"):
             nutrition_data = recipe_dict["nutritionalInfo"]
-            nutrition = NutritionInfo(
+            nutrition = NutritionInfo.model_construct(
                 calories=self._parse_int(nutrition_data.get("calories")),
                 protein_g=self._parse_float(nutrition_data.get("protein", "0g")),
                 carbs_g=self._parse_float(nutrition_data.get("carbs", "0g")),
@@ -371,13 +933,8 @@ class GeminiService:
             )
         
         # Map difficulty
-        difficulty_map = {
-            "easy": DifficultyLevel.EASY,
-            "medium": DifficultyLevel.MEDIUM,
-            "hard": DifficultyLevel.HARD
-        }
-        difficulty = difficulty_map.get(
-            recipe_dict.get("difficulty", "medium").lower(), 
+        difficulty = _DIFFICULTY_MAP.get(
+            (recipe_dict.get("difficulty") or "medium").lower(),
             DifficultyLevel.MEDIUM
         )
         
@@ -386,116 +943,98 @@ class GeminiService:
         if request.meal_type:
             meal_types = [request.meal_type]
         
-        recipe = RecipeCreate(
-            title=recipe_dict.get("name", "Generated Recipe"),
-            description=recipe_dict.get("description", ""),
-            ingredients=ingredients,
-            steps=steps,
-            prep_time_minutes=self._parse_time(recipe_dict.get("prepTime")),
-            cook_time_minutes=self._parse_time(recipe_dict.get("cookTime")),
-            servings=recipe_dict.get("servings", request.servings),
-            difficulty=difficulty,
-            meal_type=meal_types,
-            cuisine=recipe_dict.get("cuisine", request.cuisine),
-            tags=recipe_dict.get("tags", []),
-            nutrition=nutrition
-        )
+        # Validate the top-level fields; the prebuilt leaf instances are accepted as-is
+        recipe = validate_recipe_create({
+            "title": recipe_dict.get("name", "Generated Recipe"),
+            "description": recipe_dict.get("description", ""),
+            "ingredients": ingredients,
+            "steps": steps,
+            "prep_time_minutes": self._parse_time(recipe_dict.get("prepTime")),
+            "cook_time_minutes": self._parse_time(recipe_dict.get("cookTime")),
+            "servings": recipe_dict.get("servings", request.servings),
+            "difficulty": difficulty,
+            "meal_type": meal_types,
+            "cuisine": recipe_dict.get("cuisine", request.cuisine),
+            "tags": recipe_dict.get("tags", []),
+            "nutrition": nutrition
+        })
         
         return recipe
 
     def _parse_quantity(self, amount_str: str) -> float:
         """Parse quantity from string."""
-        try:
-            import re
-            numbers = re.findall(r'\d+\.?\d*', str(amount_str))
-            if numbers:
-                return float(numbers[0])
-            return 1.0
-        except:
-            return 1.0
+        if isinstance(amount_str, (int, float)) and amount_str >= 0:
+            return float(amount_str)
+        match = _FLOAT_RE.search(str(amount_str))
+        return float(match.group()) if match else 1.0
 
     def _parse_int(self, value) -> Optional[int]:
         """Parse integer from various formats."""
-        try:
-            if isinstance(value, int):
-                return value
-            if isinstance(value, str):
-                import re
-                numbers = re.findall(r'\d+', value)
-                if numbers:
-                    return int(numbers[0])
-            return None
-        except:
-            return None
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            if value.isdecimal():
+                return int(value)
+            match = _INT_RE.search(value)
+            if match:
+                return int(match.group())
+        return None
 
     def _parse_float(self, value) -> Optional[float]:
         """Parse float from various formats."""
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                import re
-                numbers = re.findall(r'\d+\.?\d*', value)
-                if numbers:
-                    return float(numbers[0])
-            return None
-        except:
-            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            # Nutrition values usually look like "25g" or "12.5 g": skip the regex for those
+            number = value.rstrip('g ')
+            if number[:1].isdecimal() and number.replace('.', '', 1).isdecimal():
+                return float(number)
+            match = _FLOAT_RE.search(value)
+            if match:
+                return float(match.group())
+        return None
 
     def _parse_time(self, time_str) -> Optional[int]:
         """Parse time in minutes from string."""
-        try:
-            if isinstance(time_str, int):
-                return time_str
-            if isinstance(time_str, str):
-                import re
-                numbers = re.findall(r'\d+', time_str)
-                if numbers:
-                    return int(numbers[0])
-            return None
-        except:
-            return None
+        if isinstance(time_str, int):
+            return time_str
+        if isinstance(time_str, str):
+            if time_str.isdecimal():
+                return int(time_str)
+            match = _INT_RE.search(time_str)
+            if match:
+                return int(match.group())
+        return None
 
     def _validate_recipe_structure(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and ensure recipe has all required fields."""
-        required_fields = {
-            'name': 'Untitled Recipe',
-            'description': 'A delicious recipe',
-            'prepTime': '15 minutes',
-            'cookTime': '30 minutes',
-            'totalTime': '45 minutes',
-            'servings': 4,
-            'difficulty': 'medium',
-            'cuisine': 'International',
-            'ingredients': [],
-            'instructions': [],
-            'nutritionalInfo': {
-                'calories': 0,
-                'protein': '0g',
-                'carbs': '0g',
-                'fat': '0g',
-                'fiber': '0g'
-            },
-            'tags': [],
-            'tips': []
-        }
-        
+        recipe = _expand_recipe_keys(recipe)
+
+        # JSON schema mode normally returns exactly this shape; skip the remediation then
+        if _RECIPE_REQUIRED_KEYS.issubset(recipe) and _has_canonical_shape(recipe):
+            return recipe
+        return self._remediate_recipe_structure(recipe)
+
+    def _remediate_recipe_structure(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in missing fields and coerce malformed ones (slow path of _validate_recipe_structure)."""
         # Ensure all required fields exist
-        for field, default_value in required_fields.items():
+        for field, default in _REQUIRED_SCALAR_DEFAULTS:
+            recipe.setdefault(field, default)
+        for field, default_factory in _REQUIRED_CONTAINER_DEFAULTS:
             if field not in recipe:
-                recipe[field] = default_value
+                recipe[field] = default_factory()
         
-        # Validate ingredients structure
+        # Validate ingredients structure; well-formed entries are kept rather than copied
         if recipe['ingredients']:
-            validated_ingredients = []
-            for ingredient in recipe['ingredients']:
-                if isinstance(ingredient, dict):
-                    validated_ingredients.append({
-                        'name': ingredient.get('name', 'Unknown'),
-                        'amount': ingredient.get('amount', '1'),
-                        'unit': ingredient.get('unit', 'piece')
-                    })
-            recipe['ingredients'] = validated_ingredients
+            recipe['ingredients'] = [
+                ingredient if ingredient.keys() == _INGREDIENT_FIELDS else {
+                    'name': ingredient.get('name', 'Unknown'),
+                    'amount': ingredient.get('amount', '1'),
+                    'unit': ingredient.get('unit', 'piece')
+                }
+                for ingredient in recipe['ingredients']
+                if isinstance(ingredient, dict)
+            ]
         
         # Ensure instructions is a list
         if not isinstance(recipe['instructions'], list):
@@ -513,14 +1052,18 @@ class GeminiService:
 
     def _find_missing_ingredients(self, available: List[str], required: List[Dict[str, Any]]) -> List[str]:
         """Find ingredients that are required but not available"""
-        available_lower = [ing.lower() for ing in available]
-        missing = []
+        available_lower = frozenset(ing.lower() for ing in available)
+        if not available_lower:
+            return [req_ing["name"] for req_ing in required]
+        
+        haystack, available_re = _pantry_matcher(available_lower)
         
+        missing = []
         for req_ing in required:
             ing_name = req_ing["name"].lower()
-            # Check if any available ingredient contains the required ingredient name
-            if not any(ing_name in avail or avail in ing_name for avail in available_lower):
-                missing.append(req_ing["name"])
+            if ing_name in available_lower or ing_name in haystack or available_re.search(ing_name):
+                continue
+            missing.append(req_ing["name"])
         
         return missing
 
@@ -529,14 +1072,9 @@ class GeminiService:
         """Mock recipe generation for development/testing."""
         primary_ingredient = ingredients[0] if ingredients else "mixed ingredients"
         
-        return {
+        return _MOCK_RECIPE_TEMPLATE | {
             "name": f"Delicious {primary_ingredient.title()} Recipe",
             "description": f"A wonderful dish featuring {primary_ingredient} and other fresh ingredients",
-            "prepTime": "15 minutes",
-            "cookTime": "25 minutes",
-            "totalTime": "40 minutes",
-            "servings": 4,
-            "difficulty": "medium",
             "cuisine": cuisine_preference or "International",
             "ingredients": [
                 {
@@ -546,27 +1084,13 @@ class GeminiService:
                 } for ingredient in ingredients[:5]  # Use first 5 ingredients
             ],
             "instructions": [
-                "Prepare all ingredients by washing and chopping as needed.",
+                _MOCK_INSTRUCTIONS[0],
                 f"Heat a large pan over medium heat and add the {primary_ingredient}.",
-                "Cook for 5-7 minutes until tender.",
-                "Add remaining ingredients and seasonings.",
-                "Cook for an additional 15-20 minutes until everything is well combined.",
-                "Taste and adjust seasoning as needed.",
-                "Serve hot and enjoy!"
+                *_MOCK_INSTRUCTIONS[1:]
             ],
-            "nutritionalInfo": {
-                "calories": 320,
-                "protein": "18g",
-                "carbs": "35g",
-                "fat": "12g",
-                "fiber": "6g"
-            },
-            "tags": ["healthy", "easy", "quick", cuisine_preference or "international"],
-            "tips": [
-                "Make sure to taste and adjust seasoning throughout cooking.",
-                "This recipe can be easily doubled for larger servings.",
-                "Store leftovers in the refrigerator for up to 3 days."
-            ]
+            "nutritionalInfo": dict(_MOCK_NUTRITION),
+            "tags": [*_MOCK_TAGS, cuisine_preference or "international"],
+            "tips": list(_MOCK_TIPS)
         }
 
     async def _mock_recipe_generation_legacy(self, request: RecipeGenerationRequest) -> Dict[str, Any]:
@@ -586,12 +1110,7 @@ class GeminiService:
             ingredients.append(ingredient)
         
         # Add a common ingredient that might be missing
-        ingredients.append(RecipeIngredient(
-            name="Salt",
-            quantity=1.0,
-            unit="tsp",
-            optional=False
-        ))
+        ingredients.append(_MOCK_LEGACY_SALT)
         
         steps = [
             RecipeStep(
@@ -599,31 +1118,9 @@ class GeminiService:
                 instruction=f"Prepare all ingredients: {', '.join(available_ingredients)}",
                 duration_minutes=5
             ),
-            RecipeStep(
-                step_number=2,
-                instruction="Heat a pan over medium heat and add the main ingredients",
-                duration_minutes=10
-            ),
-            RecipeStep(
-                step_number=3,
-                instruction="Cook until tender and season with salt to taste",
-                duration_minutes=15
-            ),
-            RecipeStep(
-                step_number=4,
-                instruction="Serve hot and enjoy!",
-                duration_minutes=2
-            )
+            *_MOCK_LEGACY_STEPS
         ]
         
-        nutrition = NutritionInfo(
-            calories=320,
-            protein_g=18.0,
-            carbs_g=35.0,
-            fat_g=12.0,
-            fiber_g=6.0
-        )
-        
         recipe = RecipeCreate(
             title=f"Simple {available_ingredients[0]} Dish",
             description=f"A quick and easy recipe using {', '.join(available_ingredients)}",
@@ -636,7 +1133,7 @@ class GeminiService:
             meal_type=[request.meal_type] if request.meal_type else [MealType.DINNER],
             cuisine=request.cuisine or "Home Cooking",
             tags=["quick", "easy", "homemade"],
-            nutrition=nutrition
+            nutrition=_MOCK_LEGACY_NUTRITION
         )
         
         missing_ingredients = ["Salt"] if "salt" not in [ing.lower() for ing in request.available_ingredients] else []
@@ -672,13 +1169,10 @@ class GeminiService:
             logger.warning("Recipe description is empty - using recipe name only")
             
         # Check for potentially problematic content
-        problematic_terms = ['nsfw', 'explicit', 'inappropriate']
-        combined_text = f"{recipe_name} {recipe_description}".lower()
-        
-        for term in problematic_terms:
-            if term in combined_text:
-                logger.warning(f"Potentially problematic content detected: {term}")
-                return False
+        match = _PROBLEMATIC_TERMS_RE.search(recipe_name) or _PROBLEMATIC_TERMS_RE.search(recipe_description or "")
+        if match:
+            logger.warning("Potentially problematic content detected: %s", match.group().lower())
+            return False
                 
         return True
     
@@ -697,24 +1191,7 @@ class GeminiService:
         safe_name = recipe_name.strip()[:100]  # Limit length
         safe_description = recipe_description.strip()[:500] if recipe_description else ""
         
-        prompt = f"""Create a high-quality, professional food photography image of {safe_name}.
-
-Description: {safe_description}
-
-Style requirements:
-- Professional food photography with excellent lighting
-- Appetizing presentation on elegant dishware
-- Clean, modern plating with artistic arrangement
-- Warm, inviting colors that enhance appetite appeal
-- Sharp focus on the food with shallow depth of field
-- Minimal, clean background (white or neutral tones)
-- Restaurant-quality presentation
-- High resolution and crisp details
-- Family-friendly and appropriate content only
-
-The image should make the dish look absolutely delicious and appealing, perfect for a modern recipe application. Focus on the food presentation and avoid any inappropriate or non-food related content."""
-
-        return prompt
+        return _IMAGE_PROMPT_TEMPLATE.format(name=safe_name, description=safe_description)
 
     async def get_recipe_suggestions(self, ingredients: List[str], count: int = 3) -> List[Dict[str, Any]]:
         """
@@ -727,29 +1204,49 @@ The image should make the dish look absolutely delicious and appealing, perfect
         Returns:
             List of recipe dictionaries
         """
-        recipes = []
+        variants = list(_SUGGESTION_VARIANTS[:count])
+        if not self.flash_model:
+            return [
+                self._mock_recipe_generation(ingredients, None, variant["cuisine"])
+                for variant in variants
+            ]
         
-        # Generate different types of recipes
-        recipe_types = [
-            {"difficulty": "easy", "cuisine": "American"},
-            {"difficulty": "medium", "cuisine": "Italian"},
-            {"difficulty": "medium", "cuisine": "Asian"}
-        ]
+        ingredients = _dedupe_terms(ingredients)
+
+        # Ask for every variant in a single Gemini call so the ingredients and schema are sent once
+        recipes: List[Optional[Dict[str, Any]]] = [None] * len(variants)
+        try:
+            prompt = self._create_multi_recipe_prompt(ingredients, variants)
+            async with self._request_semaphore:
+                response = await self._generate_content(prompt, self._recipe_batch_gen_config)
+            data = loads_lenient(response.text)
+            batch = data.get("recipes", []) if isinstance(data, dict) else []
+            for i, (variant, recipe) in enumerate(zip(variants, batch)):
+                if isinstance(recipe, dict):
+                    recipe = self._validate_recipe_structure(recipe)
+                    self._recipe_cache.set(
+                        self._recipe_cache_key(ingredients, None, variant["cuisine"], variant["difficulty"]),
+                        recipe
+                    )
+                    recipes[i] = copy.deepcopy(recipe)
+        except Exception as e:
+            logger.error("Error generating batched recipe suggestions: %s", e)
         
-        for i in range(min(count, len(recipe_types))):
-            recipe_type = recipe_types[i]
-            recipe = await self.generate_recipe(
-                ingredients=ingredients,
-                difficulty=recipe_type["difficulty"],
-                cuisine_preference=recipe_type["cuisine"]
-            )
-            recipes.append(recipe)
-            
-            # Add a small delay to avoid rate limiting
-            if self.flash_model:
-                await asyncio.sleep(1)
+        # Any variant the batch didn't cover falls back to its own (concurrent) request
+        missing = [i for i, recipe in enumerate(recipes) if recipe is None]
+        if missing:
+            fallbacks = await asyncio.gather(*[
+                self.generate_recipe(
+                    ingredients=ingredients,
+                    difficulty=variants[i]["difficulty"],
+                    cuisine_preference=variants[i]["cuisine"]
+                )
+                for i in missing
+            ])
+            for i, recipe in zip(missing, fallbacks):
+                recipes[i] = recipe
         
         return recipes
 
 # Create singleton instance
-gemini_service = GeminiService()
\ No newline at end of file
+gemini_service = GeminiService()
@@ -1,35 +1,132 @@
 import os
-import base64
+import re
+import asyncio
+import pybase64
+import hashlib
 import json
 import logging
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Dict, Any, Optional
 import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from google.generativeai.types import HarmCategory, HarmBlockThreshold, generation_types
+from google.api_core import exceptions as google_exceptions
 from PIL import Image
 import io
 
 from app.core.config import settings
 from app.models.ingredient import IngredientCreate, IngredientCategory
+from app.utils.cache import TTLCache
+from app.utils.genai_config import configure_genai
+from app.utils.images import image_dimensions
+from app.utils.json_repair import JsonStreamBuffer, loads_lenient
+from app.utils.rate_limit import CircuitBreaker, retry_async
 
 logger = logging.getLogger(__name__)
 
-class GroqService:
-    def __init__(self):
-        self.api_key = settings.GEMINI_API_KEY
-        self.vision_model = None
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.vision_model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            logger.warning("GEMINI_API_KEY not found. Using mock implementation.")
+# Vision models don't benefit from more than ~1024px, and a phone photo at full size
+# is several MB per request
+_MAX_IMAGE_SIDE = 1024
+_JPEG_QUALITY = 85
 
-    def _encode_image_to_base64(self, image_data: bytes) -> str:
-        """Convert image bytes to base64 string."""
-        return base64.b64encode(image_data).decode('utf-8')
+def _prepare_image(image_data: bytes) -> Dict[str, Any]:
+    """
+    Downscale an upload to fit _MAX_IMAGE_SIDE and re-encode it as JPEG.
+    Returned as a blob dict so the SDK sends it as-is instead of converting
+    the PIL image to lossless WebP itself.
+    """
+    with Image.open(io.BytesIO(image_data)) as image:
+        if image.format == "JPEG" and max(image.size) <= _MAX_IMAGE_SIDE:
+            return {"mime_type": "image/jpeg", "data": image_data}
+        # For JPEGs this lets the decoder scale down while decoding
+        image.draft("RGB", (_MAX_IMAGE_SIDE, _MAX_IMAGE_SIDE))
+        image.thumbnail((_MAX_IMAGE_SIDE, _MAX_IMAGE_SIDE), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, "JPEG", quality=_JPEG_QUALITY, optimize=True)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
 
-    def _create_ingredient_prompt(self) -> str:
-        """Create the prompt for ingredient recognition."""
-        return """
+# Produce (fruits and vegetables)
+_PRODUCE_ITEMS = (
+    # Fruits
+    'apple', 'apples', 'banana', 'bananas', 'orange', 'oranges', 'berry', 'berries',
+    'strawberry', 'strawberries', 'blueberry', 'blueberries', 'raspberry', 'raspberries',
+    'blackberry', 'blackberries', 'cranberry', 'cranberries',
+    'grape', 'grapes', 'lemon', 'lemons', 'lime', 'limes', 'pear', 'pears', 'peach', 'peaches',
+    'plum', 'plums', 'cherry', 'cherries', 'mango', 'mangoes', 'pineapple', 'avocado', 'avocados',
+    'kiwi', 'melon', 'watermelon', 'cantaloupe', 'grapefruit', 'coconut', 'papaya', 'fig', 'figs',
+    # Vegetables
+    'tomato', 'tomatoes', 'onion', 'onions', 'carrot', 'carrots', 'lettuce', 'spinach',
+    'potato', 'potatoes', 'bell pepper', 'bell peppers', 'cucumber', 'cucumbers',
+    'broccoli', 'cauliflower', 'cabbage', 'celery', 'radish', 'radishes', 'beet', 'beets',
+    'corn', 'peas', 'green beans', 'asparagus', 'zucchini', 'squash', 'eggplant', 'mushroom', 'mushrooms',
+    'kale', 'arugula', 'chard', 'leek', 'leeks', 'scallion', 'scallions', 'green onion', 'shallot', 'shallots'
+)
+
+# Protein sources
+_PROTEIN_ITEMS = (
+    'chicken', 'beef', 'pork', 'fish', 'turkey', 'lamb', 'salmon', 'tuna', 'cod', 'shrimp',
+    'crab', 'lobster', 'eggs', 'egg', 'tofu', 'tempeh', 'seitan', 'beans', 'lentils', 'chickpeas',
+    'black beans', 'kidney beans', 'pinto beans', 'navy beans', 'lima beans', 'edamame',
+    'nuts', 'almonds', 'walnuts', 'pecans', 'cashews', 'peanuts', 'pistachios', 'hazelnuts',
+    'seeds', 'sunflower seeds', 'pumpkin seeds', 'chia seeds', 'flax seeds', 'hemp seeds',
+    'bacon', 'ham', 'sausage', 'ground beef', 'ground turkey', 'ground chicken', 'steak',
+    'pork chops', 'chicken breast', 'chicken thighs', 'duck', 'venison', 'bison'
+)
+
+# Dairy products
+_DAIRY_ITEMS = (
+    'milk', 'cheese', 'yogurt', 'butter', 'cream', 'sour cream', 'cottage cheese', 'ricotta',
+    'mozzarella', 'cheddar', 'swiss', 'parmesan', 'feta', 'goat cheese', 'cream cheese',
+    'half and half', 'heavy cream', 'whipped cream', 'ice cream', 'frozen yogurt', 'kefir',
+    'buttermilk', 'condensed milk', 'evaporated milk', 'powdered milk'
+)
+
+# Grains and starches
+_GRAIN_ITEMS = (
+    'rice', 'bread', 'pasta', 'flour', 'oats', 'quinoa', 'barley', 'wheat', 'rye', 'millet',
+    'buckwheat', 'amaranth', 'bulgur', 'couscous', 'farro', 'spelt', 'teff', 'cornmeal',
+    'polenta', 'grits', 'cereal', 'crackers', 'bagel', 'bagels', 'muffin', 'muffins',
+    'tortilla', 'tortillas', 'pita', 'naan', 'rolls', 'buns', 'croissant', 'croissants',
+    'pancake mix', 'baking mix', 'breadcrumbs', 'oatmeal', 'granola', 'muesli'
+)
+
+# Spices and seasonings
+_SPICE_ITEMS = (
+    'salt', 'black pepper', 'white pepper', 'pepper', 'garlic', 'ginger', 'basil', 'oregano', 'thyme', 'rosemary', 'sage',
+    'parsley', 'cilantro', 'dill', 'mint', 'chives', 'tarragon', 'bay leaves', 'cumin',
+    'coriander', 'paprika', 'chili powder', 'cayenne', 'turmeric', 'curry powder', 'garam masala',
+    'cinnamon', 'nutmeg', 'cloves', 'allspice', 'cardamom', 'vanilla', 'extract', 'garlic powder',
+    'onion powder', 'dried herbs', 'italian seasoning', 'herbs de provence', 'everything bagel seasoning',
+    'red pepper flakes', 'black peppercorns', 'peppercorns', 'white pepper', 'sesame seeds', 'poppy seeds',
+    'mustard seed', 'fennel seeds', 'caraway seeds', 'anise', 'star anise', 'saffron'
+)
+
+def _keyword_pattern(words) -> re.Pattern:
+    """
+    One alternation per category, matching whole words (plus a plural s/es) so that
+    "sausages" isn't a spice because it contains "sage", nor "chickpeas" produce via "peas"
+    """
+    alternation = '|'.join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternation})(?:e?s)?\b')
+
+# Checked in order - spices first since some items like "pepper" could be ambiguous
+_CATEGORY_PATTERNS = (
+    (IngredientCategory.SPICES, _keyword_pattern(_SPICE_ITEMS)),
+    (IngredientCategory.PRODUCE, _keyword_pattern(_PRODUCE_ITEMS)),
+    (IngredientCategory.PROTEIN, _keyword_pattern(_PROTEIN_ITEMS)),
+    (IngredientCategory.DAIRY, _keyword_pattern(_DAIRY_ITEMS)),
+    (IngredientCategory.GRAINS, _keyword_pattern(_GRAIN_ITEMS)),
+)
+
+# Flash-Lite is noticeably faster for plain "what's in this fridge" identification;
+# callers that need the best accuracy can ask for the full Flash model
+_VISION_MODEL = 'gemini-2.0-flash-lite'
+_QUALITY_VISION_MODEL = 'gemini-2.0-flash-exp'
+
+# The request pieces below never change, so they're built once. The generation config is kept
+# in the SDK's normalized dict form and the safety settings live on the models, otherwise the
+# SDK converts both again on every call
+_INGREDIENT_PROMPT = """
         Analyze this image of a fridge or pantry and identify all visible food ingredients. 
         For each ingredient, provide:
         1. Name of the ingredient
@@ -50,12 +147,84 @@ class GroqService:
         Only include ingredients you can clearly identify. If you're unsure about an item, either exclude it or give it a lower confidence score.
         """
 
-    async def recognize_ingredients(self, image_data: bytes) -> List[Dict[str, Any]]:
+# Safety settings are kept at medium so ordinary food photos aren't blocked
+_SAFETY_SETTINGS = MappingProxyType({
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+})
+_GENERATION_CONFIG = generation_types.to_generation_config_dict(genai.types.GenerationConfig(
+    temperature=0,
+    max_output_tokens=1000,
+))
+
+# Rate limited (429) / temporarily unavailable (503): worth retrying with backoff
+_RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+
+_QUANTITY_RE = re.compile(r'\d+\.?\d*')
+
+# Keyword -> (priority, unit). The lookahead makes findall report overlapping hits too
+_UNIT_RANKS = {
+    'piece': (0, 'pieces'), 'item': (0, 'pieces'),
+    'bottle': (1, 'bottles'),
+    'container': (2, 'containers'), 'box': (2, 'containers'),
+    'cup': (3, 'cups'),
+    'lb': (4, 'lbs'), 'pound': (4, 'lbs'),
+    'kg': (5, 'kg'),
+}
+_UNIT_RE = re.compile(f"(?=({'|'.join(_UNIT_RANKS)}))", re.IGNORECASE)
+
+# The same names and quantities ("Milk", "1 carton") come back scan after scan, so the pure
+# string parsers are memoized. They live at module level so the caches don't hold on to self
+@lru_cache(maxsize=4096)
+def _category_of(ingredient_name: str) -> IngredientCategory:
+    name_lower = ingredient_name.lower()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(name_lower):
+            return category
+    return IngredientCategory.OTHER
+
+@lru_cache(maxsize=4096)
+def _quantity_of(quantity_str: str) -> float:
+    # Extract first number from string
+    match = _QUANTITY_RE.search(quantity_str)
+    return float(match.group()) if match else 1.0
+
+@lru_cache(maxsize=4096)
+def _unit_of(quantity_str: str) -> str:
+    # Several keywords can appear ("1 box of 6 pieces"): the earliest in _UNIT_RANKS wins
+    return min((_UNIT_RANKS[unit.lower()] for unit in _UNIT_RE.findall(quantity_str)),
+               default=(0, 'pieces'))[1]
+
+class GroqService:
+    def __init__(self):
+        self.api_key = settings.GEMINI_API_KEY
+        self.vision_model = None
+        self.quality_vision_model = None
+        if self.api_key:
+            configure_genai(self.api_key)
+            self.vision_model = genai.GenerativeModel(_VISION_MODEL, safety_settings=_SAFETY_SETTINGS)
+            self.quality_vision_model = genai.GenerativeModel(_QUALITY_VISION_MODEL, safety_settings=_SAFETY_SETTINGS)
+        else:
+            logger.warning("GEMINI_API_KEY not found. Using mock implementation.")
+        # Same photo uploaded again (retries, re-scans): reuse the result for a week
+        self._recognition_cache = TTLCache(maxsize=256, ttl=7 * 24 * 3600)
+        # After repeated API failures, go straight to the mock for a while instead of
+        # making every request wait out its own doomed call
+        self._vision_breaker = CircuitBreaker(fail_max=5, reset_timeout=30)
+
+    def _create_ingredient_prompt(self) -> str:
+        """Create the prompt for ingredient recognition."""
+        return _INGREDIENT_PROMPT
+
+    async def recognize_ingredients(self, image_data: bytes, high_quality: bool = False) -> List[Dict[str, Any]]:
         """
         Analyze an image to identify ingredients.
         
         Args:
             image_data: Raw image bytes
+            high_quality: Use the larger (slower) vision model
             
         Returns:
             List of ingredient dictionaries with name, quantity, estimatedExpiration, and confidence
@@ -63,43 +232,57 @@ class GroqService:
         if not self.vision_model:
             return self._mock_ingredient_recognition()
 
+        cache_key = (hashlib.blake2b(image_data, digest_size=16).digest(), high_quality)
+        cached = self._recognition_cache.get(cache_key)
+        if cached is not None:
+            return [dict(ingredient) for ingredient in cached]
+
+        if not self._vision_breaker.allow():
+            logger.warning("Gemini vision API is failing, using mock ingredient recognition")
+            return self._mock_ingredient_recognition()
+
         try:
-            # Create PIL Image from bytes for Gemini
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Create the prompt
-            prompt = self._create_ingredient_prompt()
-            
-            # Configure safety settings to be less restrictive for food content
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            }
+            # Every call the breaker let through must report back, whatever it raises (bad
+            # image, timeout, cancellation), or a half-open trial would never settle
+            succeeded = False
+            try:
+                # Shrink the upload before sending it to Gemini (CPU-bound, so off the event loop)
+                image = await asyncio.to_thread(_prepare_image, image_data)
 
-            # Make API call to Gemini with image
-            response = self.vision_model.generate_content(
-                [prompt, image],
-                safety_settings=safety_settings,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=1000,
-                )
-            )
+                # Make API call to Gemini with image, streaming so we can stop reading
+                # as soon as the JSON array closes (anything after it is ignored anyway)
+                model = self.quality_vision_model if high_quality else self.vision_model
+
+                async def call():
+                    return await model.generate_content_async(
+                        [_INGREDIENT_PROMPT, image],
+                        generation_config=_GENERATION_CONFIG,
+                        stream=True
+                    )
+
+                response = await retry_async(call, _RETRYABLE_ERRORS, attempts=settings.GEMINI_MAX_ATTEMPTS)
+                buffer = JsonStreamBuffer()
+                async for chunk in response:
+                    if buffer.feed(chunk.text):
+                        break
+                succeeded = True
+            finally:
+                if succeeded:
+                    self._vision_breaker.record_success()
+                else:
+                    self._vision_breaker.record_failure()
 
             # Parse the response
-            content = response.text
+            content = buffer.text
             
             # Extract JSON from the response
             try:
-                # Find JSON array in the response
+                # Find JSON array in the response; the stream buffer already cut it at its closing
+                # bracket, and a truncated array (max tokens hit) is repaired rather than dropped
                 start_idx = content.find('[')
-                end_idx = content.rfind(']') + 1
                 
-                if start_idx != -1 and end_idx != 0:
-                    json_str = content[start_idx:end_idx]
-                    ingredients = json.loads(json_str)
+                if start_idx != -1:
+                    ingredients = loads_lenient(content[start_idx:])
                     
                     # Validate the structure
                     validated_ingredients = []
@@ -112,6 +295,7 @@ class GroqService:
                                 'confidence': float(ingredient['confidence'])
                             })
                     
+                    self._recognition_cache.set(cache_key, [dict(ingredient) for ingredient in validated_ingredients])
                     return validated_ingredients
                 else:
                     logger.error("No valid JSON array found in Gemini response")
@@ -125,6 +309,25 @@ class GroqService:
             logger.error(f"Error calling Gemini API: {e}")
             return self._mock_ingredient_recognition()
 
+    async def recognize_ingredients_batch(self, images: List[bytes], concurrency: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Recognize ingredients in several images concurrently.
+        
+        Args:
+            images: Raw image bytes, one entry per image
+            concurrency: Maximum number of vision calls in flight at once
+            
+        Returns:
+            One ingredient list per image, in the same order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def recognize(image_data: bytes) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.recognize_ingredients(image_data)
+
+        return await asyncio.gather(*(recognize(image_data) for image_data in images))
+
     async def detect_ingredients(self, image_data: str) -> Dict[str, Any]:
         """
         Legacy method for compatibility with existing vision.py interface.
@@ -137,9 +340,26 @@ class GroqService:
             Dictionary containing detected ingredients and confidence score
         """
         try:
-            # Decode base64 image data
-            image_bytes = base64.b64decode(image_data)
+            # Decode base64 image data (multi-MB uploads, so off the event loop)
+            image_bytes = await asyncio.to_thread(pybase64.b64decode, image_data)
+        except Exception as e:
+            logger.error(f"Error in detect_ingredients: {e}")
+            return await self._mock_ingredient_detection()
+
+        return await self.detect_ingredients_bytes(image_bytes)
+
+    async def detect_ingredients_bytes(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Detect ingredients from raw image bytes, for callers that already have them
+        (skips the base64 round trip). Same result shape as detect_ingredients.
+        
+        Args:
+            image_bytes: Raw image bytes
             
+        Returns:
+            Dictionary containing detected ingredients and confidence score
+        """
+        try:
             # Use the new recognize_ingredients method
             raw_ingredients = await self.recognize_ingredients(image_bytes)
             
@@ -169,112 +389,20 @@ class GroqService:
             }
             
         except Exception as e:
-            logger.error(f"Error in detect_ingredients: {e}")
+            logger.error(f"Error in detect_ingredients_bytes: {e}")
             return await self._mock_ingredient_detection()
 
     def _guess_category(self, ingredient_name: str) -> IngredientCategory:
         """Guess ingredient category based on name."""
-        name_lower = ingredient_name.lower()
-        
-        # Produce (fruits and vegetables)
-        produce_items = [
-            # Fruits
-            'apple', 'apples', 'banana', 'bananas', 'orange', 'oranges', 'berry', 'berries',
-            'strawberry', 'strawberries', 'blueberry', 'blueberries', 'raspberry', 'raspberries',
-            'grape', 'grapes', 'lemon', 'lemons', 'lime', 'limes', 'pear', 'pears', 'peach', 'peaches',
-            'plum', 'plums', 'cherry', 'cherries', 'mango', 'mangoes', 'pineapple', 'avocado', 'avocados',
-            'kiwi', 'melon', 'watermelon', 'cantaloupe', 'grapefruit', 'coconut', 'papaya', 'fig', 'figs',
-            # Vegetables
-            'tomato', 'tomatoes', 'onion', 'onions', 'carrot', 'carrots', 'lettuce', 'spinach',
-            'potato', 'potatoes', 'bell pepper', 'bell peppers', 'cucumber', 'cucumbers',
-            'broccoli', 'cauliflower', 'cabbage', 'celery', 'radish', 'radishes', 'beet', 'beets',
-            'corn', 'peas', 'green beans', 'asparagus', 'zucchini', 'squash', 'eggplant', 'mushroom', 'mushrooms',
-            'kale', 'arugula', 'chard', 'leek', 'leeks', 'scallion', 'scallions', 'green onion', 'shallot', 'shallots'
-        ]
-        
-        # Protein sources
-        protein_items = [
-            'chicken', 'beef', 'pork', 'fish', 'turkey', 'lamb', 'salmon', 'tuna', 'cod', 'shrimp',
-            'crab', 'lobster', 'eggs', 'egg', 'tofu', 'tempeh', 'seitan', 'beans', 'lentils', 'chickpeas',
-            'black beans', 'kidney beans', 'pinto beans', 'navy beans', 'lima beans', 'edamame',
-            'nuts', 'almonds', 'walnuts', 'pecans', 'cashews', 'peanuts', 'pistachios', 'hazelnuts',
-            'seeds', 'sunflower seeds', 'pumpkin seeds', 'chia seeds', 'flax seeds', 'hemp seeds',
-            'bacon', 'ham', 'sausage', 'ground beef', 'ground turkey', 'ground chicken', 'steak',
-            'pork chops', 'chicken breast', 'chicken thighs', 'duck', 'venison', 'bison'
-        ]
-        
-        # Dairy products
-        dairy_items = [
-            'milk', 'cheese', 'yogurt', 'butter', 'cream', 'sour cream', 'cottage cheese', 'ricotta',
-            'mozzarella', 'cheddar', 'swiss', 'parmesan', 'feta', 'goat cheese', 'cream cheese',
-            'half and half', 'heavy cream', 'whipped cream', 'ice cream', 'frozen yogurt', 'kefir',
-            'buttermilk', 'condensed milk', 'evaporated milk', 'powdered milk'
-        ]
-        
-        # Grains and starches
-        grain_items = [
-            'rice', 'bread', 'pasta', 'flour', 'oats', 'quinoa', 'barley', 'wheat', 'rye', 'millet',
-            'buckwheat', 'amaranth', 'bulgur', 'couscous', 'farro', 'spelt', 'teff', 'cornmeal',
-            'polenta', 'grits', 'cereal', 'crackers', 'bagel', 'bagels', 'muffin', 'muffins',
-            'tortilla', 'tortillas', 'pita', 'naan', 'rolls', 'buns', 'croissant', 'croissants',
-            'pancake mix', 'baking mix', 'breadcrumbs', 'oatmeal', 'granola', 'muesli'
-        ]
-        
-        # Spices and seasonings
-        spice_items = [
-            'salt', 'black pepper', 'white pepper', 'pepper', 'garlic', 'ginger', 'basil', 'oregano', 'thyme', 'rosemary', 'sage',
-            'parsley', 'cilantro', 'dill', 'mint', 'chives', 'tarragon', 'bay leaves', 'cumin',
-            'coriander', 'paprika', 'chili powder', 'cayenne', 'turmeric', 'curry powder', 'garam masala',
-            'cinnamon', 'nutmeg', 'cloves', 'allspice', 'cardamom', 'vanilla', 'extract', 'garlic powder',
-            'onion powder', 'dried herbs', 'italian seasoning', 'herbs de provence', 'everything bagel seasoning',
-            'red pepper flakes', 'black peppercorns', 'white pepper', 'sesame seeds', 'poppy seeds',
-            'mustard seed', 'fennel seeds', 'caraway seeds', 'anise', 'star anise', 'saffron'
-        ]
-        
-        # Check each category - check spices first since some items like "pepper" could be ambiguous
-        if any(item in name_lower for item in spice_items):
-            return IngredientCategory.SPICES
-        elif any(item in name_lower for item in produce_items):
-            return IngredientCategory.PRODUCE
-        elif any(item in name_lower for item in protein_items):
-            return IngredientCategory.PROTEIN
-        elif any(item in name_lower for item in dairy_items):
-            return IngredientCategory.DAIRY
-        elif any(item in name_lower for item in grain_items):
-            return IngredientCategory.GRAINS
-        else:
-            return IngredientCategory.OTHER
+        return _category_of(ingredient_name)
 
     def _parse_quantity(self, quantity_str: str) -> float:
         """Parse quantity from string."""
-        try:
-            # Extract first number from string
-            import re
-            numbers = re.findall(r'\d+\.?\d*', quantity_str)
-            if numbers:
-                return float(numbers[0])
-            return 1.0
-        except:
-            return 1.0
+        return _quantity_of(quantity_str)
 
     def _parse_unit(self, quantity_str: str) -> str:
         """Parse unit from quantity string."""
-        quantity_lower = quantity_str.lower()
-        
-        if 'piece' in quantity_lower or 'item' in quantity_lower:
-            return 'pieces'
-        elif 'bottle' in quantity_lower:
-            return 'bottles'
-        elif 'container' in quantity_lower or 'box' in quantity_lower:
-            return 'containers'
-        elif 'cup' in quantity_lower:
-            return 'cups'
-        elif 'lb' in quantity_lower or 'pound' in quantity_lower:
-            return 'lbs'
-        elif 'kg' in quantity_lower:
-            return 'kg'
-        else:
-            return 'pieces'
+        return _unit_of(quantity_str)
 
     def _mock_ingredient_recognition(self) -> List[Dict[str, Any]]:
         """
@@ -356,19 +484,16 @@ class GroqService:
         Returns:
             True if image is valid, False otherwise
         """
+        # Check file size (should be under 10MB)
+        if len(image_data) > 10 * 1024 * 1024:
+            return False
+
         try:
-            # Check if it's a valid image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Check image size (should be reasonable)
-            width, height = image.size
+            # Check it's a valid image of a reasonable size, reading only the header
+            width, height = image_dimensions(image_data)
             if width < 100 or height < 100:
                 return False
                 
-            # Check file size (should be under 10MB)
-            if len(image_data) > 10 * 1024 * 1024:
-                return False
-                
             return True
             
         except Exception as e:
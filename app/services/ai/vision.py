@@ -19,5 +19,17 @@ class VisionService:
         """
         return await self.groq_service.detect_ingredients(image_data)
 
+    async def detect_ingredients_bytes(self, image_bytes: bytes):
+        """
+        Detect ingredients from raw image bytes (no base64 encoding needed)
+        
+        Args:
+            image_bytes: Raw image bytes
+            
+        Returns:
+            Dictionary containing detected ingredients and confidence score
+        """
+        return await self.groq_service.detect_ingredients_bytes(image_bytes)
+
 # Create singleton instance for backward compatibility
 vision_service = VisionService()
\ No newline at end of file
@@ -61,6 +61,16 @@ class FirebaseService:
             print(f"Error updating document: {e}")
             return False
     
+    async def set_document_merge(self, collection: str, document_id: str, data: Dict[str, Any]) -> bool:
+        """Create or update a document in a single write, merging nested fields"""
+        try:
+            doc_ref = self.db.collection(collection).document(document_id)
+            doc_ref.set(data, merge=True)
+            return True
+        except Exception as e:
+            print(f"Error merging document: {e}")
+            return False
+    
     async def delete_document(self, collection: str, document_id: str) -> bool:
         """Delete a document from Firestore"""
         try:
@@ -43,6 +43,18 @@ class MockFirebaseService:
             print(f"Error updating document: {e}")
             return False
     
+    async def set_document_merge(self, collection: str, document_id: str, data: Dict[str, Any]) -> bool:
+        """Create or update a document in mock storage, merging nested fields"""
+        try:
+            if collection not in self.data:
+                self.data[collection] = {}
+            document = self.data[collection].setdefault(document_id, {})
+            _merge_into(document, data)
+            return True
+        except Exception as e:
+            print(f"Error merging document: {e}")
+            return False
+    
     async def delete_document(self, collection: str, document_id: str) -> bool:
         """Delete a document from mock storage"""
         try:
@@ -69,5 +81,13 @@ class MockFirebaseService:
             print(f"Error getting collection: {e}")
             return []
 
+def _merge_into(target: Dict[str, Any], data: Dict[str, Any]) -> None:
+    """Recursively merge maps the way Firestore's set(merge=True) does"""
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_into(target[key], value)
+        else:
+            target[key] = value
+
 # Create a singleton instance
 firebase_service = MockFirebaseService()
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import uuid
+import asyncio
 import logging
 from typing import Optional
 import firebase_admin
@@ -24,7 +25,7 @@ class FirebaseStorageService:
             logger.error(f"Failed to initialize Firebase Storage: {e}")
 
     async def upload_image(self, image_data: bytes, folder: str = "recipe_images", 
-                          filename: str = None) -> Optional[str]:
+                          filename: str = None, content_type: str = "image/jpeg") -> Optional[str]:
         """
         Upload an image to Firebase Storage.
         
@@ -32,6 +33,7 @@ class FirebaseStorageService:
             image_data: Raw image bytes
             folder: Storage folder path
             filename: Optional custom filename (will generate UUID if not provided)
+            content_type: MIME type stored with the blob
             
         Returns:
             Public URL of the uploaded image or None if failed
@@ -48,36 +50,42 @@ class FirebaseStorageService:
             # Create the full path
             blob_path = f"{folder}/{filename}"
             
-            # Create blob and upload
-            blob = self.bucket.blob(blob_path)
-            blob.upload_from_string(
-                image_data,
-                content_type='image/jpeg'
-            )
-            
-            # Make the blob publicly accessible
-            blob.make_public()
-            
-            # Return the public URL
-            return blob.public_url
+            # The storage client is blocking HTTP, so run it off the event loop
+            return await asyncio.to_thread(self._upload_public_blob, blob_path, image_data, content_type)
             
         except Exception as e:
             logger.error(f"Failed to upload image to Firebase Storage: {e}")
             return None
 
-    async def upload_recipe_image(self, image_data: bytes, recipe_id: str) -> Optional[str]:
+    def _upload_public_blob(self, blob_path: str, image_data: bytes, content_type: str) -> str:
+        """Upload bytes to a blob, make it public and return its URL (blocking)."""
+        blob = self.bucket.blob(blob_path)
+        blob.upload_from_string(
+            image_data,
+            content_type=content_type
+        )
+        
+        # Make the blob publicly accessible
+        blob.make_public()
+        
+        return blob.public_url
+
+    async def upload_recipe_image(self, image_data: bytes, recipe_id: str,
+                                  extension: str = "jpg", content_type: str = "image/jpeg") -> Optional[str]:
         """
         Upload a recipe image with a specific naming convention.
         
         Args:
             image_data: Raw image bytes
             recipe_id: ID of the recipe
+            extension: File extension for the stored image
+            content_type: MIME type stored with the blob
             
         Returns:
             Public URL of the uploaded image or None if failed
         """
-        filename = f"recipe_{recipe_id}_{uuid.uuid4().hex[:8]}.jpg"
-        return await self.upload_image(image_data, "recipe_images", filename)
+        filename = f"recipe_{recipe_id}_{uuid.uuid4().hex[:8]}.{extension}"
+        return await self.upload_image(image_data, "recipe_images", filename, content_type)
 
     async def upload_ingredient_scan_image(self, image_data: bytes, user_id: str) -> Optional[str]:
         """
@@ -117,9 +125,9 @@ class FirebaseStorageService:
                 if len(parts) > 1:
                     blob_path = parts[1].split("?")[0]  # Remove query parameters
                     
-                    # Delete the blob
+                    # Delete the blob (blocking call, so off the event loop)
                     blob = self.bucket.blob(blob_path)
-                    blob.delete()
+                    await asyncio.to_thread(blob.delete)
                     
                     logger.info(f"Successfully deleted image: {blob_path}")
                     return True
@@ -0,0 +1,19 @@
+"""
+Process-wide configuration of the google-generativeai SDK
+"""
+from typing import Optional
+
+_configured_api_key: Optional[str] = None
+
+def configure_genai(api_key: str) -> None:
+    """
+    genai.configure, but only once per API key. Configuring again throws away the
+    SDK's cached clients, so each service would end up with its own gRPC channel
+    instead of sharing one.
+    """
+    global _configured_api_key
+    if api_key == _configured_api_key:
+        return
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    _configured_api_key = api_key
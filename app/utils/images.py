@@ -0,0 +1,61 @@
+"""
+Helpers for reading basic facts about encoded images without decoding them
+"""
+import struct
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT/JPG/DAC), which carry the image dimensions
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the first JPEG SOF segment, or None if the markers can't be walked"""
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a WebP VP8/VP8L/VP8X header, or None if it isn't one of those"""
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a" and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and data[20:21] == b"\x2f" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+def image_dimensions(data: bytes) -> Tuple[int, int]:
+    """
+    (width, height) of an encoded image, read from the PNG/JPEG/WebP header.
+    Other formats go through PIL, which also only reads the header; raises if the data isn't an image.
+    """
+    if data[:8] == PNG_SIGNATURE and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    if data[:3] == JPEG_SIGNATURE:
+        size = _jpeg_size(data)
+        if size:
+            return size
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        size = _webp_size(data)
+        if size:
+            return size
+    with Image.open(BytesIO(data)) as image:
+        return image.size
@@ -0,0 +1,172 @@
+"""
+Best-effort repair of truncated or slightly malformed JSON from LLM responses
+"""
+from typing import Any, List
+
+import orjson
+
+_CLOSERS = {'{': '}', '[': ']'}
+_LITERAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz')
+_NUMBER_TAIL_CHARS = frozenset('.-+eE')
+_LITERALS = frozenset(('true', 'false', 'null'))
+
+def _string_start(out: List[str]) -> int:
+    """Index of the opening quote of the string that ends at out[-1]"""
+    i = len(out) - 2
+    while i >= 0:
+        if out[i] == '"':
+            backslashes = 0
+            j = i - 1
+            while j >= 0 and out[j] == '\\':
+                backslashes += 1
+                j -= 1
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return 0
+
+def _last_significant(out: List[str], end: int) -> str:
+    i = end - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    return out[i] if i >= 0 else ''
+
+def _close_dangling(out: List[str], closer: str) -> None:
+    """Tidy the tail of `out` so that appending `closer` yields valid JSON"""
+    while out and out[-1].isspace():
+        out.pop()
+    # Truncated literal (tru, nul): drop it; truncated number (12., 1e): trim it
+    i = len(out)
+    while i > 0 and out[i - 1] in _LITERAL_CHARS:
+        i -= 1
+    word = ''.join(out[i:])
+    if word and word not in _LITERALS and not (i > 0 and out[i - 1].isdigit()):
+        del out[i:]
+        if out and out[-1] in ':,':
+            out.append('null')
+    elif word not in _LITERALS:
+        while out and out[-1] in _NUMBER_TAIL_CHARS:
+            out.pop()
+    while out and out[-1].isspace():
+        out.pop()
+    if closer == '}' and out and out[-1] == '"':
+        # A bare key with no value yet: drop it
+        start = _string_start(out)
+        if _last_significant(out, start) in ('{', ','):
+            del out[start:]
+            while out and out[-1].isspace():
+                out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+    elif out and out[-1] == ':':
+        out.append('null')
+
+def repair_json(text: str) -> str:
+    """
+    Return the first JSON object/array in `text`, repaired so it parses:
+    leading prose and code fences are skipped, trailing prose is dropped,
+    trailing commas and bare keys are removed and unterminated strings/containers are closed.
+    """
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        return text
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in '}]':
+            if not stack:
+                break
+            closer = stack.pop()
+            _close_dangling(out, closer)
+            out.append(closer)
+            if not stack:
+                break
+            continue
+        out.append(ch)
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    while stack:
+        closer = stack.pop()
+        _close_dangling(out, closer)
+        out.append(closer)
+    return ''.join(out)
+
+class JsonStreamBuffer:
+    """
+    Accumulates streamed chunks of JSON text, tracking string/nesting state so callers
+    can stop reading as soon as the first top-level object/array has closed.
+    """
+
+    def __init__(self):
+        self.complete = False
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._in_string = self._escape = False
+
+    @property
+    def text(self) -> str:
+        """Everything received so far, cut just after the top-level container once complete"""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """Add the next chunk; returns True once the top-level container is complete"""
+        if self.complete:
+            return True
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._depth > 0
+            elif ch in _CLOSERS:
+                self._depth += 1
+            elif ch in '}]' and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self._chunks.append(chunk[:i + 1])
+                    self.complete = True
+                    return True
+        self._chunks.append(chunk)
+        return False
+
+def loads_lenient(text: str) -> Any:
+    """
+    orjson.loads, retrying once on the repaired text if the raw text doesn't parse.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep catching the latter.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    # Usually it's just prose or code fences around an intact object: try the
+    # outermost {...}/[...] slice before the (pure Python) character-level repair
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if starts:
+        start = min(starts)
+        end = text.rfind(_CLOSERS[text[start]])
+        if end > start:
+            try:
+                return orjson.loads(text[start:end + 1])
+            except orjson.JSONDecodeError:
+                pass
+    return orjson.loads(repair_json(text))
@@ -0,0 +1,88 @@
+"""
+Async rate limiting, retry and circuit breaker helpers for outbound API calls
+"""
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+class AsyncRateLimiter:
+    """
+    Token bucket allowing bursts of up to `max_rate` acquisitions, refilled
+    at `max_rate` per `period` seconds. A `max_rate` of 0 disables limiting.
+    """
+
+    def __init__(self, max_rate: float, period: float = 60.0):
+        self.max_rate = max_rate
+        self.period = period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.max_rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.max_rate, self._tokens + (now - self._updated) * self.max_rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.max_rate)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+def backoff_delay(attempt: int, initial: float = 0.5, maximum: float = 8.0) -> float:
+    """Exponential backoff with full jitter for the given 0-based retry attempt"""
+    return random.uniform(0, min(maximum, initial * 2 ** attempt))
+
+async def retry_async(call: Callable[[], Awaitable[T]], retry_on: Tuple[Type[BaseException], ...],
+                      attempts: int = 3, initial: float = 0.5, maximum: float = 8.0) -> T:
+    """Await `call()`, retrying up to `attempts` times in total when it raises one of `retry_on`"""
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(backoff_delay(attempt, initial, maximum))
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing: after `fail_max` consecutive failures
+    allow() returns False for `reset_timeout` seconds, then lets a trial call through.
+    A success closes the circuit again; another failure keeps it open for a further period.
+    """
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            # Half-open: let this call through, but hold the others back while it runs
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
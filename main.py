@@ -1,5 +1,6 @@
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
@@ -14,6 +15,7 @@ def create_application() -> FastAPI:
         debug=settings.DEBUG,
         openapi_url=f"{settings.API_PREFIX}/openapi.json",
         docs_url=f"{settings.API_PREFIX}/docs",
+        default_response_class=ORJSONResponse,
     )
 
     # Set up CORS
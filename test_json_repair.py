@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM JSON repair helper in app/utils/json_repair.py
+"""
+import json
+
+from app.utils.json_repair import JsonStreamBuffer, loads_lenient, repair_json
+
+def test_valid_json_is_unchanged():
+    """Already-valid JSON round-trips untouched"""
+    text = '{"name": "Soup", "tags": ["warm", "easy"], "servings": 4}'
+    assert json.loads(repair_json(text)) == json.loads(text)
+    print("✓ Valid JSON unchanged")
+
+def test_prose_and_code_fences_are_stripped():
+    """Leading prose / fences and trailing chatter are dropped"""
+    text = 'Here you go:\n```json\n{"name": "Soup"}\n```\nEnjoy!'
+    assert loads_lenient(text) == {"name": "Soup"}
+    print("✓ Prose and fences stripped")
+
+def test_truncated_output_is_closed():
+    """Truncated responses are closed so the parsed prefix is kept"""
+    assert loads_lenient('{"name": "Soup", "tags": ["warm", "ea') == {"name": "Soup", "tags": ["warm", "ea"]}
+    assert loads_lenient('{"name": "Soup", "servings":') == {"name": "Soup", "servings": None}
+    assert loads_lenient('{"name": "Soup", "servings"') == {"name": "Soup"}
+    assert loads_lenient('{"name": "Soup", "serv') == {"name": "Soup"}
+    assert loads_lenient('{"name": "Soup", "vegan": tr') == {"name": "Soup", "vegan": None}
+    assert loads_lenient('{"name": "Soup", "vegan": true') == {"name": "Soup", "vegan": True}
+    assert loads_lenient('{"name": "Soup", "kcal": 12.') == {"name": "Soup", "kcal": 12}
+    assert loads_lenient('{"kcal": 1.5e-') == {"kcal": 1.5}
+    assert loads_lenient('{"items": [1, 2,') == {"items": [1, 2]}
+    print("✓ Truncated output repaired")
+
+def test_trailing_commas_removed():
+    """Trailing commas before closers are removed"""
+    assert loads_lenient('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+    print("✓ Trailing commas removed")
+
+def test_stream_buffer_stops_at_top_level_close():
+    """Braces inside strings are ignored and text after the closing brace is cut"""
+    text = 'Sure: {"a": "x}\\"{", "b": [1, {"c": 2}]} and then more'
+    buffer = JsonStreamBuffer()
+    chunks = [text[i:i + 4] for i in range(0, len(text), 4)]
+    fed = 0
+    for chunk in chunks:
+        fed += 1
+        if buffer.feed(chunk):
+            break
+    assert buffer.complete and fed < len(chunks)
+    assert buffer.text.endswith("}]}")
+    assert loads_lenient(buffer.text) == {"a": 'x}"{', "b": [1, {"c": 2}]}
+    print("✓ Stream buffer stops at the top-level close")
+
+if __name__ == "__main__":
+    test_valid_json_is_unchanged()
+    test_prose_and_code_fences_are_stripped()
+    test_truncated_output_is_closed()
+    test_trailing_commas_removed()
+    test_stream_buffer_stops_at_top_level_close()
+    print("\nAll JSON repair tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the retry and rate limiting helpers in app/utils/rate_limit.py
+"""
+import asyncio
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from app.utils.rate_limit import AsyncRateLimiter, CircuitBreaker, retry_async
+
+class Transient(Exception):
+    pass
+
+def test_retry_until_success():
+    """Retryable errors are retried and the eventual result returned"""
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Transient()
+        return "ok"
+
+    result = asyncio.run(retry_async(flaky, (Transient,), attempts=3, initial=0.001))
+    assert result == "ok" and len(calls) == 3
+    print("✓ Retries until success")
+
+def test_retry_gives_up_and_skips_other_errors():
+    """The last retryable error is re-raised; other errors are not retried"""
+    calls = []
+
+    async def always(exc):
+        calls.append(1)
+        raise exc
+
+    try:
+        asyncio.run(retry_async(lambda: always(Transient()), (Transient,), attempts=2, initial=0.001))
+        assert False, "expected Transient"
+    except Transient:
+        assert len(calls) == 2
+
+    calls.clear()
+    try:
+        asyncio.run(retry_async(lambda: always(ValueError()), (Transient,), attempts=3, initial=0.001))
+        assert False, "expected ValueError"
+    except ValueError:
+        assert len(calls) == 1
+    print("✓ Gives up after max attempts and doesn't retry other errors")
+
+def test_rate_limiter_paces_after_burst():
+    """Bursts up to max_rate pass immediately, further acquisitions wait for a refill"""
+    async def run():
+        limiter = AsyncRateLimiter(max_rate=2, period=0.1)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.04
+    print("✓ Rate limiter paces after the burst")
+
+def test_circuit_breaker_opens_and_recovers():
+    """The circuit opens after fail_max failures and a successful trial call closes it"""
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()       # trial call
+    assert not breaker.allow()   # others wait while it runs
+    breaker.record_success()
+    assert breaker.allow()
+    print("✓ Circuit breaker opens after repeated failures and recovers")
+
+def test_vision_breaker_counts_any_failure():
+    """A recognition call that dies with a non-API error still reports to the breaker"""
+    from app.services.ai.groq_service import GroqService
+
+    class BrokenModel:
+        async def generate_content_async(self, *args, **kwargs):
+            raise RuntimeError("connection reset")
+
+    service = GroqService()
+    service.vision_model = BrokenModel()
+    service._vision_breaker = CircuitBreaker(fail_max=1, reset_timeout=0.05)
+
+    # Undecodable image: fails before the API call, but still counts
+    asyncio.run(service.recognize_ingredients(b"not an image"))
+    assert not service._vision_breaker.allow()
+
+    # Half-open trial failing with something other than a GoogleAPIError reopens the circuit
+    time.sleep(0.06)
+    png = BytesIO()
+    Image.new("RGB", (8, 8)).save(png, "PNG")
+    asyncio.run(service.recognize_ingredients(png.getvalue()))
+    assert not service._vision_breaker.allow()
+    print("✓ Vision breaker records failures that aren't Gemini API errors")
+
+if __name__ == "__main__":
+    test_retry_until_success()
+    test_retry_gives_up_and_skips_other_errors()
+    test_rate_limiter_paces_after_burst()
+    test_circuit_breaker_opens_and_recovers()
+    test_vision_breaker_counts_any_failure()
+    print("\nAll rate limit tests passed!")
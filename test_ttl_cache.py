@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process TTL/LRU cache in app/utils/cache.py
+"""
+import time
+
+from app.utils.cache import TTLCache
+
+def test_lru_eviction():
+    """Oldest untouched entry is evicted once maxsize is exceeded"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # touch "a" so "b" becomes least recent
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    print("✓ LRU eviction works")
+
+def test_ttl_expiry():
+    """Entries disappear after their TTL"""
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    print("✓ TTL expiry works")
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry()
+    print("\nAll cache tests passed!")